@@ -0,0 +1,19 @@
+# --------------------------------------------------------------------
+# Program: Assets
+# Description: Loads the images used by the program once, converted
+#   to the display's pixel format so they are quick to draw, and
+#   shares the same surface with everything that shows the image.
+# --------------------------------------------------------------------
+
+import pygame
+
+images = dict()  # file name:converted image
+
+
+# returns an image, loading it the first time it is asked for (the display must be set up first)
+# the surface is shared, so it must not be drawn on
+def image(file_name):
+    surface = images.get(file_name)
+    if surface is None:
+        surface = images[file_name] = pygame.image.load(file_name).convert_alpha()
+    return surface
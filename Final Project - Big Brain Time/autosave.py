@@ -0,0 +1,148 @@
+# --------------------------------------------------------------------
+# Program: Autosave
+# Description: Background writer for a storage engine (change journal
+#   or task database). Changes are queued by the main loop and written
+#   by a separate thread, so saving never stops the window from being
+#   drawn. Changes made close together are written at the same time.
+#   Changes that fail to be written are kept and written again later.
+# --------------------------------------------------------------------
+
+import queue
+import threading
+import task_data as td
+
+SAVE_DELAY = 1  # seconds to wait for more changes before writing
+RETRY_DELAY = 5  # seconds to wait before writing changes again after a write failed
+
+
+# class for saving changes from a background thread
+class AutoSaver:
+    """wraps a storage engine, doing its writing in a background thread"""
+    def __init__(self, storage, delay=SAVE_DELAY):
+        self.storage = storage
+        self.delay = delay
+        self.length = 0  # changes queued since the last compaction
+        self.lock = threading.Lock()  # held while the storage engine is in use
+        self.queue = queue.Queue()
+        self.hurry = threading.Event()  # set to write queued changes without waiting for more
+        self.unwritten = []  # queued changes not written because a write failed, written again with the next batch
+        self.error = None  # exception from the last write that failed, for the main loop to report (see take_error)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # --------------------MAIN THREAD--------------------
+
+    def load_folders(self, title, lazy=False):
+        with self.lock:
+            return self.storage.load_folders(title, lazy)
+
+    def load_contents(self, folder):
+        with self.lock:
+            self.storage.load_contents(folder)
+
+    def read_user_data(self, user):
+        with self.lock:
+            self.storage.read_user_data(user)
+
+    def append(self, record):
+        self.queue.put(("record", record))
+        self.length += 1
+
+    def needs_compaction(self):
+        return self.storage.compact_limit is not None and self.length >= self.storage.compact_limit
+
+    # the snapshot is taken straight away, so later changes to the folders do not affect what is written
+    def compact(self, main_folder):
+        with self.lock:
+            snapshot = self.storage.snapshot(main_folder)
+        self.queue.put(("compact", snapshot))
+        self.length = 0
+
+    # finds tasks with the storage engine's due day index, once it has every change (see database.py)
+    def tasks_due_between(self, main_folder, first_day, last_day):
+        self.flush()
+        with self.lock:
+            return self.storage.tasks_due_between(main_folder, first_day, last_day)
+
+    def save_user_data(self, user):
+        copy = td.UserData()
+        copy.studysessions = [list(pair) for pair in user.studysessions]
+        copy.taskscompleted = [list(pair) for pair in user.taskscompleted]
+        self.queue.put(("user", copy))
+
+    # wait until everything queued has been written (or has failed to be written, see take_error)
+    def flush(self):
+        self.hurry.set()
+        self.queue.join()
+        self.hurry.clear()
+
+    # write everything queued and stop the background thread
+    # raises OSError if there are changes that could not be written
+    def close(self):
+        self.hurry.set()
+        self.queue.put(None)
+        self.thread.join()
+        error = self.take_error()
+        if self.unwritten:
+            raise OSError("could not save " + str(len(self.unwritten)) + " changes") from error
+
+    # returns the error of a write that failed since it was last called (None if there was none)
+    def take_error(self):
+        error, self.error = self.error, None
+        return error
+
+    # --------------------BACKGROUND THREAD--------------------
+
+    def run(self):
+        running = True
+        while running:
+            try:  # changes that failed to be written are written again after a while, even if nothing else changes
+                batch = [self.queue.get(timeout=RETRY_DELAY if self.unwritten else None)]
+                self.hurry.wait(self.delay)  # let a burst of changes build up
+            except queue.Empty:
+                batch = []
+            while not self.queue.empty():
+                batch.append(self.queue.get())
+            running = None not in batch
+            changes = self.unwritten + [item for item in batch if item is not None]
+            self.unwritten = []
+            try:
+                self.write(changes)
+            except Exception as error:  # kept for the main loop to report, and written again with the next batch
+                self.error = error
+            finally:
+                for item in batch:
+                    self.queue.task_done()
+
+    # writes a batch of queued changes, combining them into as few writes as possible
+    # if a write fails, it and the writes after it are kept in unwritten
+    def write(self, batch):
+        writes = []
+        user = None
+        for kind, value in batch:
+            if kind == "record":
+                if writes and writes[-1][0] == "record":
+                    writes[-1][1].append(value)
+                else:
+                    writes.append(("record", [value]))
+            elif kind == "compact":
+                if value is not None:  # earlier changes are all in the snapshot
+                    writes = []
+                writes.append(("compact", value))
+            else:  # only the newest user data needs saving
+                user = value
+        if user is not None:
+            writes.append(("user", user))
+        with self.lock:
+            for i, (kind, value) in enumerate(writes):
+                try:
+                    if kind == "record":
+                        self.storage.append_all(value)
+                    elif kind == "compact":
+                        self.storage.write_snapshot(value)
+                    else:
+                        self.storage.save_user_data(value)
+                except Exception:
+                    self.unwritten = [(kind, item) for kind, value in writes[i:]
+                                      for item in (value if kind == "record" else [value])]
+                    raise
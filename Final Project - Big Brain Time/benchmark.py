@@ -0,0 +1,397 @@
+# --------------------------------------------------------------------
+# Program: Benchmarks
+# Description: Times the task archive code on large generated save
+#   files, and the relative layout and processing of generated pages.
+#   Run from the project folder with: python benchmark.py
+# --------------------------------------------------------------------
+
+import datetime
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import pygame
+import frame
+import button2 as b
+import pygameplus as pgp
+import task_data as td
+
+SIZES = [1000, 10000, 100000]
+MEMORY_SIZE = 100000
+TABLE_SIZE = 100000
+SEARCH_SIZE = 100000
+SEARCH_LIMIT = 50  # results shown on the search page
+SEARCH_QUERIES = ["task 54321", "description of 123", "descr", "nothing"]
+LAYOUT_ROWS = 1000  # rows on the generated folder page
+LAYOUT_FRAMES = 50  # most frames drawn while waiting for the draw order layout to stop changing
+HIT_TEST_BUTTONS = 2000  # buttons covering the generated page (50 columns of 40 rows)
+HIT_TEST_FRAMES = 1000  # frames processed with the mouse somewhere on the page
+DRAW_ROWS = 8  # task rows filling the generated page
+DRAW_FRAMES = 500  # frames drawn with only a small area of the page changing
+INPUT_CHARS = 2000  # characters typed into the generated input box
+INPUT_FRAMES = 100  # frames timed while typing the last characters, and while not typing
+FOLDERS_PER_LEVEL = 10  # generated archives have 10 folders with 10 sub folders each
+
+
+# writes save files holding task_count tasks spread evenly over the generated folders
+def generate_save_files(task_count):
+    folder_count = FOLDERS_PER_LEVEL * FOLDERS_PER_LEVEL
+    fi = open(td.FOLDER_FILE, 'w', encoding=td.SAVE_ENCODING, newline='\n')
+    fo = open(td.TASK_FILE, 'w', encoding=td.SAVE_ENCODING, newline='\n')
+    code = 0
+    for i in range(FOLDERS_PER_LEVEL):
+        fi.write("Folder " + str(i) + "{\n")
+        for j in range(FOLDERS_PER_LEVEL):
+            fi.write("Sub Folder " + str(j) + "{\n")
+            for k in range(task_count // folder_count):
+                task_code = "T" + str(code).zfill(9)
+                code += 1
+                fi.write(task_code + "\n")
+                fo.write(task_code + "\n")
+                fo.write("Task " + str(code) + "\n")
+                fo.write("Description of task " + str(code) + "\n")
+                fo.write(str(random.randint(1, 28)).zfill(2) + "/" + str(random.randint(1, 12)).zfill(2) + "/2020\n")
+                fo.write(str(random.randint(0, 10)) + "\n")
+            fi.write("}\n")
+        fi.write("}\n")
+    fi.close()
+    fo.close()
+
+
+# clears the task dictionaries filled when loading
+def reset():
+    td.tasks_by_code.clear()
+    td.next_task_id = 0
+    td.due_dates.clear()
+    td.search_index.clear()
+    td.table = None
+
+
+# returns the seconds taken to read in the save files
+def time_load(lazy=False):
+    reset()
+    start = time.perf_counter()
+    td.load_folders("Big Brain Time", lazy)
+    return time.perf_counter() - start
+
+
+def run_load_benchmark():
+    print("Startup (load_folders)")
+    for size in SIZES:
+        generate_save_files(size)
+        print("  " + str(size).rjust(7) + " tasks: " + str(round(time_load() * 1000, 1)) + " ms, lazy: " +
+              str(round(time_load(True) * 1000, 1)) + " ms")
+
+
+# prints the memory used by the loaded folder tree (tasks, folders and task indexes) per task
+def run_memory_benchmark():
+    generate_save_files(MEMORY_SIZE)
+    reset()
+    tracemalloc.start()
+    main_folder = td.load_folders("Big Brain Time")
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print("Memory (" + str(MEMORY_SIZE) + " tasks): " + str(used // MEMORY_SIZE) + " bytes per task")
+
+
+# returns dictionary of folder:number of overdue tasks in the folder and its sub folders, walking the folder tree
+def count_overdue_by_walking(folder, today, counts):
+    count = 0
+    for item in folder.contents:
+        if type(item) is td.Folder:
+            count += count_overdue_by_walking(item, today, counts)
+        elif item.due_day is not None and item.due_day < today:
+            count += 1
+    if count:
+        counts[folder] = count
+    return count
+
+
+# prints the time taken to count the overdue tasks in every folder, by walking the folders and with the task table
+def run_table_benchmark():
+    generate_save_files(TABLE_SIZE)
+    reset()
+    if not td.create_task_table():
+        print("Task table: numpy is not installed")
+        return
+    main_folder = td.load_folders("Big Brain Time")
+    today = datetime.date(2020, 7, 1).toordinal()
+    start = time.perf_counter()
+    walked = dict()
+    count_overdue_by_walking(main_folder, today, walked)
+    walk_time = time.perf_counter() - start
+    start = time.perf_counter()
+    counted = td.table.count_by_folder(td.table.overdue(today))
+    table_time = time.perf_counter() - start
+    print("Overdue per folder (" + str(TABLE_SIZE) + " tasks): walking " + str(round(walk_time * 1000, 1)) +
+          " ms, task table " + str(round(table_time * 1000, 1)) + " ms" + ("" if walked == counted else " (counts differ)"))
+
+
+# prints the time taken to build the search index and to search it
+def run_search_benchmark():
+    generate_save_files(SEARCH_SIZE)
+    reset()
+    td.load_folders("Big Brain Time")
+    start = time.perf_counter()
+    td.search_index.build()
+    print("Search (" + str(SEARCH_SIZE) + " tasks): building " + str(round((time.perf_counter() - start) * 1000, 1)) + " ms")
+    for query in SEARCH_QUERIES:
+        start = time.perf_counter()
+        results = td.search_index.search(query, SEARCH_LIMIT)
+        print("  " + repr(query).ljust(20) + str(len(results)).rjust(7) + " results: " +
+              str(round((time.perf_counter() - start) * 1000, 2)) + " ms")
+
+
+# returns a drawable of the given size, added to a component with a relative layout
+def add_drawable(parent, w, h):
+    drawable = frame.Drawable()
+    drawable.rect.w, drawable.rect.h = w, h
+    drawable.set_relative(parent)
+    return drawable
+
+
+# returns the window component of a page laid out like the calendar (6 rows of 7 day buttons)
+def make_calendar_page():
+    window = frame.Component(pygame.Surface((700, 600)))
+    calendar_component = frame.Component(window, frame.RELATIVE)
+    calendar_component.layout.w = frame.MATCH
+    calendar_component.layout.margin_top = 70
+    for row in range(6):
+        row_component = frame.Component(calendar_component, frame.RELATIVE)
+        if row == 0:
+            row_component.layout.gravity = "top centerx"
+        else:
+            row_component.layout.align_top = row - 1
+            row_component.layout.gravity = "centerx"
+        row_component.rect.h = 70
+        row_component.layout.w = frame.MATCH
+        for col in range(7):
+            day_button = add_drawable(row_component, 100, 50)
+            if col == 0:
+                day_button.layout.gravity = "left centery"
+            else:
+                day_button.layout.align_left = col - 1
+                day_button.layout.gravity = "centery"
+            day_button.layout.w = frame.MATCH
+            day_button.layout.h = frame.MATCH
+            day_button.w_fraction = 7.2
+            day_button.layout.set_margin(1)
+    return window
+
+
+# returns the window component of a folder page with LAYOUT_ROWS task boxes, each laid out like template_task_box
+def make_folder_page():
+    window = frame.Component(pygame.Surface((700, 600)))
+    folder_list = frame.Component(window, frame.RELATIVE)
+    folder_list.layout.w = frame.MATCH
+    for i in range(LAYOUT_ROWS):
+        component = frame.Component(folder_list, frame.RELATIVE)
+        component.layout.w = frame.MATCH
+        component.rect.h = 100
+        if i > 0:
+            component.layout.align_top = i - 1
+            component.layout.margin_top = 5
+        toggle_button = add_drawable(component, 40, 40)
+        toggle_button.layout.gravity = "left centery"
+        toggle_button.layout.margin_left = 15
+        toggle_button.layout.margin_right = 20
+        title = add_drawable(component, 200, 24)
+        title.layout.margin_top = 5
+        title.layout.align_left = 0
+        description = add_drawable(component, 300, 16)
+        description.layout.align_left = 0
+        description.layout.align_top = 1
+        date = add_drawable(component, 80, 14)
+        date.layout.align_left = 0
+        date.layout.margin_bottom = 5
+        date.layout.gravity = "bottom"
+        priority_icon = add_drawable(component, 80, 80)
+        priority_icon.layout.gravity = "right centery"
+        priority_icon.layout.margin_right = 20
+    return window
+
+
+# lays out the contents of a component the way drawing them does, one drawable at a time in draw order
+def lay_out_in_draw_order(component):
+    for item in component.contents:
+        item.set_relative_rect()
+        if isinstance(item, frame.Component):
+            lay_out_in_draw_order(item)
+
+
+# returns list of the rects of every drawable in a component tree, in draw order
+def all_rects(component):
+    rects = []
+    for item in component.contents:
+        rects.append(item.rect.get())
+        if isinstance(item, frame.Component):
+            rects += all_rects(item)
+    return rects
+
+
+# prints the time taken to lay out each page from scratch, frame by frame in draw order and with the layout solver
+def run_layout_benchmark():
+    print("Layout (from scratch until it stops changing)")
+    for name, make_page in [("calendar", make_calendar_page), (str(LAYOUT_ROWS) + " row folder", make_folder_page)]:
+        window = make_page()
+        frame.layout_passes = 0
+        start = time.perf_counter()
+        frames = 0
+        while frames < LAYOUT_FRAMES and not window.contents[0].layout_valid():
+            lay_out_in_draw_order(window)
+            frames += 1
+        draw_order_time = time.perf_counter() - start
+        draw_order_passes = frame.layout_passes
+        draw_order_rects = all_rects(window)
+
+        window = make_page()
+        frame.layout_passes = 0
+        start = time.perf_counter()
+        window.layout_solver.solve()
+        solver_time = time.perf_counter() - start
+        print("  " + name.ljust(16) + "draw order: " + str(round(draw_order_time * 1000, 1)) + " ms over " + str(frames) +
+              " frames (" + str(draw_order_passes) + " rects), solver: " + str(round(solver_time * 1000, 1)) + " ms (" +
+              str(frame.layout_passes) + " rects, " + str(len(all_rects(window))) + " drawables)" +
+              ("" if all_rects(window) == draw_order_rects else " (rects differ)"))
+
+
+# returns the window component of a page covered by HIT_TEST_BUTTONS small buttons
+def make_button_page():
+    window = frame.Component(pygame.Surface((700, 600)))
+    for i in range(HIT_TEST_BUTTONS):
+        button = b.Button()
+        button.set_width(14)
+        button.set_height(15)
+        button.set_relative(window)
+        button.layout.gravity = "left top"
+        button.layout.margin_left = i % 50 * 14
+        button.layout.margin_top = i // 50 * 15
+    return window
+
+
+# processes every drawable in a component tree from the last drawn to the first, returning used_process
+def process_every_drawable(component, click_bool, release_bool, mouse_pos, used_process):
+    for item in component.contents[::-1]:
+        if isinstance(item, frame.Component):
+            used_process = process_every_drawable(item, click_bool, release_bool, mouse_pos, used_process)
+        else:
+            used_process = item.process(click_bool, release_bool, mouse_pos, used_process)
+    return used_process
+
+
+# prints the time taken to process a frame of a page with many buttons, processing every button and with the hit grid
+def run_hit_test_benchmark():
+    pygame.init()
+    window = make_button_page()
+    window.layout_solver.solve()
+    mouse_positions = [(random.randrange(700), random.randrange(600)) for i in range(HIT_TEST_FRAMES)]
+    start = time.perf_counter()
+    for mouse_pos in mouse_positions:
+        process_every_drawable(window, False, False, mouse_pos, None)
+    every_time = time.perf_counter() - start
+    every_colors = [button.current_fill_color for button in window.contents]
+    start = time.perf_counter()
+    for mouse_pos in mouse_positions:
+        window.process(False, False, mouse_pos, None)
+    grid_time = time.perf_counter() - start
+    print("Processing (" + str(HIT_TEST_BUTTONS) + " buttons): every drawable " +
+          str(round(every_time * 1000 / HIT_TEST_FRAMES, 3)) + " ms per frame, hit grid " +
+          str(round(grid_time * 1000 / HIT_TEST_FRAMES, 3)) + " ms per frame" +
+          ("" if [button.current_fill_color for button in window.contents] == every_colors else " (colours differ)"))
+
+
+# returns the window component of a page of DRAW_ROWS rows, each laid out like template_task_box
+def make_row_page(cached):
+    window = frame.Component(pygame.Surface((700, 600)))
+    for i in range(DRAW_ROWS):
+        component = frame.Component(window, frame.RELATIVE)
+        component.layout.w = frame.MATCH
+        component.rect.h = 70
+        component.cached = cached
+        if i > 0:
+            component.layout.align_top = i - 1
+            component.layout.margin_top = 5
+        toggle_button = b.ToggleButton()
+        toggle_button.set_relative(component)
+        toggle_button.layout.gravity = "left centery"
+        toggle_button.layout.margin_left = 15
+        toggle_button.set_width(25)
+        toggle_button.set_height(25)
+        toggle_button.set_round_edges(0.9)
+        title = pgp.Label("Task " + str(i))
+        title.set_relative(component)
+        title.set_size(24)
+        title.layout.align_left = 0
+        title.layout.margin_top = 5
+        description = pgp.Label("Description of task " + str(i))
+        description.set_relative(component)
+        description.layout.align_left = 0
+        description.layout.align_top = 1
+        priority_button = b.Button()
+        priority_button.set_relative(component)
+        priority_button.set_width(60)
+        priority_button.set_height(60)
+        priority_button.set_round_edges(1)
+        priority_button.set_text(str(i))
+        priority_button.layout.gravity = "right centery"
+        priority_button.layout.margin_right = 20
+    return window
+
+
+# prints the time taken to draw a frame of a page of rows when only a small area below them changes (such as a timer),
+# drawing every row and with cached rows
+def run_draw_benchmark():
+    pygame.init()
+    win = pygame.Surface((700, 600))
+    print("Drawing (" + str(DRAW_ROWS) + " rows, small area changing)")
+    for name, cached in [("every drawable", False), ("cached rows", True)]:
+        window = make_row_page(cached)
+        frame.mark_all_dirty()
+        frame.take_dirty_rects()
+        window.draw(win)
+        start = time.perf_counter()
+        for i in range(DRAW_FRAMES):
+            frame.mark_dirty((600, 560, 40, 30))
+            rects = frame.take_dirty_rects()
+            win.set_clip(rects[0].unionall(rects[1:]))
+            window.draw(win)
+            win.set_clip(None)
+        print("  " + name.ljust(16) + str(round((time.perf_counter() - start) * 1000 / DRAW_FRAMES, 3)) + " ms per frame")
+
+
+# prints the time taken for a frame of a focused input box holding a long text, typing and not typing
+def run_input_benchmark():
+    pygame.init()
+    win = pygame.display.set_mode((700, 600))  # input boxes convert their surface for the window
+    input_box = pgp.Input((600, 70))
+    input_box.focus = True
+    for i in range(INPUT_CHARS + INPUT_FRAMES):
+        if i == INPUT_CHARS - INPUT_FRAMES:
+            start = time.perf_counter()
+        elif i == INPUT_CHARS:
+            typing_time = time.perf_counter() - start
+            start = time.perf_counter()
+        if i < INPUT_CHARS:
+            input_box.process_focus([pygame.event.Event(pygame.KEYDOWN, key=0, unicode="abcdefghij "[i % 11])], None)
+        else:
+            input_box.process_focus([pygame.event.Event(pygame.KEYUP, key=0)], None)
+        input_box.process(False, False, (0, 0), None)
+        input_box.draw(win)
+    print("Input box (" + str(INPUT_CHARS) + " characters): typing " + str(round(typing_time * 1000 / INPUT_FRAMES, 3)) +
+          " ms per frame, not typing " + str(round((time.perf_counter() - start) * 1000 / INPUT_FRAMES, 3)) + " ms per frame")
+
+
+if __name__ == "__main__":
+    start_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as bench_dir:
+        os.chdir(bench_dir)
+        run_load_benchmark()
+        run_memory_benchmark()
+        run_table_benchmark()
+        run_search_benchmark()
+        run_layout_benchmark()
+        run_hit_test_benchmark()
+        run_draw_benchmark()
+        run_input_benchmark()
+        os.chdir(start_dir)
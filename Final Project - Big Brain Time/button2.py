@@ -160,7 +160,9 @@ class Button(frame.Drawable):
             self.rendered_text.draw(win)
 
     # function to process button events
+    # a change of colour (such as from hovering) marks the button to be drawn again
     def process(self, click_bool, release_bool, mouse_pos, used_process):
+        last_fill_color = self.current_fill_color
         if (self.is_hovered(mouse_pos) or self.is_clicked) and self.active and used_process is None:
             if click_bool:
                 self.on_click_default()
@@ -171,14 +173,24 @@ class Button(frame.Drawable):
             else:
                 self.on_hover_default()
                 self.on_hover(self)
-            return True
+            used_process = True
         else:
             self.reset_color()
-            return used_process
+        if self.current_fill_color != last_fill_color and self.visible:
+            self.mark_changed()
+        return used_process
 
     # reset colour to default color
     def reset_color(self):
-        self.current_fill_color = self.default_fill_color
+        self.current_fill_color = self.rest_color()
+
+    # returns the colour of the button when it is not hovered or clicked
+    def rest_color(self):
+        return self.default_fill_color
+
+    # a button drawn hovered or held down has to be processed again to go back to its default colour
+    def needs_processing(self):
+        return super().needs_processing() or self.is_clicked or self.current_fill_color != self.rest_color()
 
     # empty function (to be replaced by custom functions in instantiated button objects)
     def blank_func(self, blank):
@@ -187,38 +199,48 @@ class Button(frame.Drawable):
     # --------------------SETTER AND GETTER METHODS--------------------
 
     def set_x(self, value):
-        self.rect.x = value
-        self.reset_text_pos()
+        self.set_rect_value("x", value)
 
     def set_y(self, value):
-        self.rect.y = value
-        self.reset_text_pos()
+        self.set_rect_value("y", value)
 
     def set_pos(self, x, y):
-        self.rect.x, self.rect.y = x, y
-        self.reset_text_pos()
+        self.set_rect_value("x", x)
+        self.set_rect_value("y", y)
 
     def set_width(self, value):
-        self.rect.w = value
-        self.reset_text_pos()
+        self.set_rect_value("w", value)
 
     def set_height(self, value):
-        self.rect.h = value
+        self.set_rect_value("h", value)
+
+    # sets x, y, w or h of the rect, laying out drawables again if it changed
+    def set_rect_value(self, name, value):
+        if getattr(self.rect, name) != value:
+            setattr(self.rect, name, value)
+            frame.invalidate_layout()
         self.reset_text_pos()
 
+    # changes to how the button looks mark it to be drawn again
     def set_text(self, text):
+        if text != self.text:
+            self.mark_changed()
         self.text = text
         self.render_text()
 
     def set_font(self, font):
         self.text_font = font
         self.render_text()
+        self.mark_changed()
 
     def set_text_size(self, size):
         self.text_size = size
         self.render_text()
+        self.mark_changed()
 
     def set_visibility(self, b):
+        if b != self.visible:
+            self.mark_changed()
         self.visible = b
 
     def set_active(self, b):
@@ -226,12 +248,18 @@ class Button(frame.Drawable):
 
     def set_border(self, value):
         self.border = value
+        self.mark_changed()
 
+    # the colour is reset right away, as buttons are only processed once the mouse is over them
     def set_default_fill_color(self, color):
         self.default_fill_color = color
+        if not self.is_clicked:
+            self.reset_color()
+        self.mark_changed()
 
     def set_border_color(self, color):
         self.border_color = color
+        self.mark_changed()
 
     def set_hold_color(self, color):
         self.on_hold_color = color
@@ -249,6 +277,7 @@ class Button(frame.Drawable):
         if y is not None:
             self.tAlignY = y
         self.reset_text_pos()
+        self.mark_changed()
 
     def set_round_edges(self, value):
         if value > 1 or value < 0:
@@ -275,6 +304,7 @@ class DropDownButton(Button):
         self.menu_direction = DOWN
         self.spacing = 0
         self.open = False
+        self.processes_everywhere = True  # clicks anywhere close the menu
 
     # updated process function to include drop down buttons
     def process(self, click_bool, release_bool, mouse_pos, used_process):
@@ -287,6 +317,32 @@ class DropDownButton(Button):
             self.on_release(self)
         return used_process
 
+    # the open menu is drawn outside the button
+    def get_drawn_rect(self):
+        rects = [rect for b, rect in zip(self.drop_buttons, self.menu_rects()) if b.visible]
+        return pygame.Rect(self.get_rect()).unionall(rects)
+
+    # returns list of the rects (x, y, w, h) the drop down buttons are drawn in
+    def menu_rects(self):
+        y = self.get_y()
+        if self.drop_buttons_width == MATCH:
+            w = self.get_w()
+        else:
+            w = self.drop_buttons_width
+        if self.menu_side == LEFT:
+            x = self.get_x()
+        else:
+            x = self.get_x() + self.get_w() - w
+        rects = []
+        for b in self.drop_buttons:
+            change = self.get_h() - 1 + self.spacing  # -1 to remove 1 pixel gap between buttons
+            if self.menu_direction == DOWN:
+                y += change
+            else:
+                y -= change
+            rects.append((x, y, w, self.get_h()))
+        return rects
+
     # create invisible and inactive drop down buttons
     def create_buttons(self, button_names):
         b_list = []
@@ -300,60 +356,34 @@ class DropDownButton(Button):
             b_list.append(new_button)
         return b_list
 
-    # open and close drawer
+    # open and close drawer (marking the menu to be drawn again)
     def on_release_default(self):
         super().on_release_default()
+        self.mark_changed()
         self.open = not self.open
         for b in self.drop_buttons:
             b.set_active(self.open)
-            b.set_visibility(self.open)
+            b.visible = self.open
+        self.mark_changed()
 
     def draw_as_rect(self, win):
         super().draw_as_rect(win)
-        y = self.get_y()
-        if self.drop_buttons_width == MATCH:
-            w = self.get_w()
-        else:
-            w = self.drop_buttons_width
-        if self.menu_side == LEFT:
-            x = self.get_x()
-        else:
-            x = self.get_x() + self.get_w() - w
-        for b in self.drop_buttons:
-            change = self.get_h() - 1 + self.spacing  # -1 to remove 1 pixel gap between buttons
-            if self.menu_direction == DOWN:
-                y += change
-            else:
-                y -= change
+        for b, (x, y, w, h) in zip(self.drop_buttons, self.menu_rects()):
             if b.visible:
                 b.set_x(x)
                 b.set_y(y)
                 b.set_width(w)
-                b.set_height(self.get_h())
+                b.set_height(h)
                 b.draw_as_rect(win)
 
     def draw_with_rounded_edges(self, win):
         super().draw_with_rounded_edges(win)
-        y = self.get_y()
-        if self.drop_buttons_width == MATCH:
-            w = self.get_w()
-        else:
-            w = self.drop_buttons_width
-        if self.menu_side == LEFT:
-            x = self.get_x()
-        else:
-            x = self.get_x() + self.get_w() - w
-        for b in self.drop_buttons:
-            change = self.get_h() - 1 + self.spacing  # -1 to remove 1 pixel gap between buttons
-            if self.menu_direction == DOWN:
-                y += change
-            else:
-                y -= change
+        for b, (x, y, w, h) in zip(self.drop_buttons, self.menu_rects()):
             if b.visible:
                 b.set_x(x)
                 b.set_y(y)
                 b.set_width(w)
-                b.set_height(self.get_h())
+                b.set_height(h)
                 b.set_round_edges(self.round_edges)
                 b.rounded_strength = self.rounded_strength
                 b.draw_with_rounded_edges(win)
@@ -361,9 +391,9 @@ class DropDownButton(Button):
     # --------------------SETTER AND GETTER METHODS--------------------
 
     def set_default_fill_color(self, color):
-        self.default_fill_color = color
+        super().set_default_fill_color(color)
         for b in self.drop_buttons:
-            b.default_fill_color = color
+            b.set_default_fill_color(color)
 
     def set_border_color(self, color):
         self.border_color = color
@@ -431,16 +461,18 @@ class ToggleButton(Button):
             else:
                 self.current_fill_color = self.on_hover_color
 
-    def reset_color(self):
+    def rest_color(self):
         if self.toggled:
-            self.current_fill_color = self.toggled_color
-        else:
-            self.current_fill_color = self.default_fill_color
+            return self.toggled_color
+        return self.default_fill_color
 
     # --------------------SETTER AND GETTER METHODS--------------------
 
     def set_toggle_color(self, color):
         self.toggled_color = color
+        if not self.is_clicked:
+            self.reset_color()
+        self.mark_changed()
 
     def set_toggle_hold_color(self, color):
         self.toggled_hold_color = color
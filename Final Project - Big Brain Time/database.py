@@ -0,0 +1,237 @@
+# --------------------------------------------------------------------
+# Program: Task Database
+# Description: Optional storage engine keeping folders, tasks and user
+#   data in an SQLite database instead of the text save files. Has
+#   the same methods as the change journal, so either can be used by
+#   the main program. Each change record becomes a single indexed
+#   update instead of a rewrite of the save files.
+# --------------------------------------------------------------------
+
+import os
+import sqlite3
+import task_data as td
+
+DATABASE_FILE = 'Big Brain Time.db'
+MAIN_FOLDER_ID = 0  # parent id of the top level folders
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (id INTEGER PRIMARY KEY, parent INTEGER NOT NULL,
+                                    position INTEGER NOT NULL, title TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS folders_by_parent ON folders (parent, position);
+CREATE TABLE IF NOT EXISTS tasks (code TEXT PRIMARY KEY, folder INTEGER NOT NULL, title TEXT,
+                                  description TEXT, due_date TEXT, due_day INTEGER, priority INTEGER);
+CREATE INDEX IF NOT EXISTS tasks_by_folder ON tasks (folder);
+CREATE INDEX IF NOT EXISTS tasks_by_due_day ON tasks (due_day);
+CREATE INDEX IF NOT EXISTS tasks_by_priority ON tasks (priority);
+CREATE TABLE IF NOT EXISTS user_data (kind TEXT NOT NULL, position INTEGER NOT NULL,
+                                      date TEXT NOT NULL, value REAL NOT NULL);
+"""
+
+
+# class for storing the folder tree in an SQLite database
+class TaskDatabase:
+    """sqlite storage engine with the same methods as journal.Journal"""
+    def __init__(self, file_name=DATABASE_FILE):
+        self.file_name = file_name
+        self.length = 0  # changes waiting to be compacted (always 0, each change is saved straight away)
+        self.compact_limit = None
+        # may be used by the autosave thread, which only uses it while holding its lock
+        self.connection = sqlite3.connect(file_name, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    # --------------------LOADING--------------------
+
+    # reads in all folders and tasks, returning the main folder
+    # a new database is filled from the text save files if there are any
+    # when lazy, each folder's tasks are read in by load_contents when it is first opened
+    def load_folders(self, title, lazy=False):
+        if self.is_empty() and os.path.exists(td.FOLDER_FILE) and os.path.exists(td.TASK_FILE):
+            main_folder = td.load_folders(title)
+            self.import_folders(main_folder)
+            return main_folder
+        main_folder = td.Folder(title)
+        folders = {MAIN_FOLDER_ID: main_folder}
+        # parents are always created before their sub folders, so ids increase down the tree
+        for folder_id, parent, folder_title in self.connection.execute(
+                "SELECT id, parent, title FROM folders ORDER BY id"):
+            folders[folder_id] = td.Folder(folder_title, folders[parent])
+        for folder_id, parent, folder_title in self.connection.execute(
+                "SELECT id, parent, title FROM folders ORDER BY parent, position"):
+            folders[parent].add(folders[folder_id])
+        if lazy:
+            for folder_id in folders:
+                folders[folder_id].unloaded = folder_id
+            # tasks are not registered until their folder is opened, so find the newest task code
+            # (base 36 codes sort by length and then by their digits)
+            for row in self.connection.execute("SELECT code FROM tasks WHERE length(code) < ? "
+                                               "ORDER BY length(code) DESC, code DESC LIMIT 1", (td.OLD_CODE_LENGTH,)):
+                td.use_task_code(row[0])
+            return main_folder
+        for row in self.connection.execute(
+                "SELECT folder, code, title, description, due_date, priority FROM tasks ORDER BY rowid"):
+            task = td.Task(row[1], row[2], row[3], row[4], row[5], folders[row[0]])
+            task.parent.add(task)
+            td.register_task(task)
+        return main_folder
+
+    # reads in the tasks of a folder loaded lazily by load_folders
+    def load_contents(self, folder):
+        for row in self.connection.execute(
+                "SELECT code, title, description, due_date, priority FROM tasks WHERE folder = ? ORDER BY rowid",
+                (folder.unloaded,)):
+            task = td.Task(row[0], row[1], row[2], row[3], row[4], folder)
+            folder.add(task)
+            td.register_task(task)
+        folder.unloaded = None
+
+    def is_empty(self):
+        return self.connection.execute("SELECT NOT EXISTS (SELECT 1 FROM folders UNION ALL SELECT 1 FROM tasks)").fetchone()[0]
+
+    # writes a whole folder tree into the database
+    def import_folders(self, main_folder):
+        with self.connection:
+            self.connection.execute("DELETE FROM folders")
+            self.connection.execute("DELETE FROM tasks")
+            self.insert_contents(main_folder, MAIN_FOLDER_ID)
+
+    def insert_contents(self, folder, folder_id):
+        position = 0
+        for item in folder.contents:
+            if type(item) is td.Folder:
+                new_id = self.connection.execute("INSERT INTO folders (parent, position, title) VALUES (?, ?, ?)",
+                                                 (folder_id, position, item.title)).lastrowid
+                position += 1
+                self.insert_contents(item, new_id)
+            else:
+                self.insert_task(item.data, folder_id)
+
+    # --------------------QUERIES--------------------
+
+    # returns the id of the folder at the end of a path created by td.folder_path
+    def find_folder_id(self, path):
+        folder_id = MAIN_FOLDER_ID
+        for position in path:
+            folder_id = self.connection.execute("SELECT id FROM folders WHERE parent = ? AND position = ?",
+                                                (folder_id, position)).fetchone()[0]
+        return folder_id
+
+    # returns the path of a folder (see td.folder_path) from its id
+    def folder_path(self, folder_id):
+        path = []
+        while folder_id != MAIN_FOLDER_ID:
+            folder_id, position = self.connection.execute("SELECT parent, position FROM folders WHERE id = ?",
+                                                          (folder_id,)).fetchone()
+            path.insert(0, position)
+        return path
+
+    # returns dictionary of due day:list of tasks for every day between two day numbers (inclusive) with tasks due,
+    # like td.DateIndex.by_day, but found with the due day index so folders that have not been opened are not read in
+    # tasks that have not been read in are given as copies that are not added to their folder
+    def tasks_due_between(self, main_folder, first_day, last_day):
+        folders = dict()  # folder id:folder
+        by_day = dict()
+        for row in self.connection.execute(
+                "SELECT due_day, code, title, description, due_date, priority, folder FROM tasks "
+                "WHERE due_day BETWEEN ? AND ? ORDER BY due_day, rowid", (first_day, last_day)):
+            task = td.tasks_by_code.get(row[1])
+            if task is None:
+                if row[6] not in folders:
+                    folders[row[6]] = td.find_folder(main_folder, self.folder_path(row[6]))
+                task = td.Task(row[1], row[2], row[3], row[4], row[5], folders[row[6]])
+            by_day.setdefault(row[0], []).append(task)
+        return by_day
+
+    # --------------------SAVING--------------------
+
+    def insert_task(self, data, folder_id):
+        code, title, description, date, priority = data
+        self.connection.execute("INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                (code, folder_id, title, description, date, td.date_ordinal(date), int(priority)))
+
+    # saves one change record (see journal.py for the record types)
+    def append(self, record):
+        self.append_all([record])
+
+    # saves a list of change records in one transaction
+    def append_all(self, records):
+        with self.connection:
+            for record in records:
+                self.apply_change(record)
+
+    # applies one change record (in the open transaction)
+    def apply_change(self, record):
+        if record["op"] == "add":
+            folder_id = self.find_folder_id(record["folder"])
+            if "task" in record:
+                self.insert_task(record["task"], folder_id)
+            else:
+                position = self.connection.execute("SELECT COUNT(*) FROM folders WHERE parent = ?",
+                                                   (folder_id,)).fetchone()[0]
+                self.connection.execute("INSERT INTO folders (parent, position, title) VALUES (?, ?, ?)",
+                                        (folder_id, position, record["title"]))
+        elif record["op"] == "remove":
+            if "code" in record:
+                self.connection.execute("DELETE FROM tasks WHERE code = ?", (record["code"],))
+            else:
+                self.remove_folder(self.find_folder_id(record["folder"]))
+        elif record["op"] == "move":
+            self.connection.execute("UPDATE tasks SET folder = ? WHERE code = ?",
+                                    (self.find_folder_id(record["folder"]), record["code"]))
+        elif record["op"] == "edit":
+            code, title, description, date, priority = record["task"]
+            self.connection.execute("UPDATE tasks SET title = ?, description = ?, due_date = ?, due_day = ?, "
+                                    "priority = ? WHERE code = ?",
+                                    (title, description, date, td.date_ordinal(date), int(priority), code))
+
+    # removes a folder with all of its contents, moving up the folders after it
+    def remove_folder(self, folder_id):
+        parent, position = self.connection.execute("SELECT parent, position FROM folders WHERE id = ?",
+                                                    (folder_id,)).fetchone()
+        self.connection.execute("""WITH RECURSIVE subtree(id) AS (
+                                       SELECT ? UNION ALL SELECT folders.id FROM folders, subtree
+                                       WHERE folders.parent = subtree.id)
+                                   DELETE FROM tasks WHERE folder IN subtree""", (folder_id,))
+        self.connection.execute("""WITH RECURSIVE subtree(id) AS (
+                                       SELECT ? UNION ALL SELECT folders.id FROM folders, subtree
+                                       WHERE folders.parent = subtree.id)
+                                   DELETE FROM folders WHERE id IN subtree""", (folder_id,))
+        self.connection.execute("UPDATE folders SET position = position - 1 WHERE parent = ? AND position > ?",
+                                (parent, position))
+
+    # every change is already saved, so there is nothing to compact
+    def needs_compaction(self):
+        return False
+
+    def compact(self, main_folder):
+        self.write_snapshot(self.snapshot(main_folder))
+
+    @staticmethod
+    def snapshot(main_folder):
+        return None
+
+    def write_snapshot(self, snapshot):
+        self.connection.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    # --------------------USER DATA--------------------
+
+    def save_user_data(self, user):
+        with self.connection:
+            self.connection.execute("DELETE FROM user_data")
+            for kind, pairs in [("study", user.studysessions), ("tasks", user.taskscompleted)]:
+                self.connection.executemany("INSERT INTO user_data VALUES (?, ?, ?, ?)",
+                                            [(kind, i, pair[0], pair[1]) for i, pair in enumerate(pairs)])
+
+    # reads in user data, filling a new database from the text file if there is one
+    def read_user_data(self, user):
+        if not self.connection.execute("SELECT EXISTS (SELECT 1 FROM user_data)").fetchone()[0]:
+            if os.path.exists(td.USER_FILE):
+                user.ReadInData()
+                self.save_user_data(user)
+            return
+        for kind, date, value in self.connection.execute("SELECT kind, date, value FROM user_data ORDER BY kind, position"):
+            if kind == "study":
+                user.studysessions.append([date, value])
+            else:
+                user.taskscompleted.append([date, value])
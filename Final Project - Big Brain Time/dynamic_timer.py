@@ -32,6 +32,8 @@ class DynamicTimer(frame.Drawable):
         self.rendered_text = None
         self.center_color = c.RED
         self.bar_color = c.BLUE
+        self.drawn_state = None  # what the timer showed when it was last drawn (see get_state)
+        self.processes_everywhere = True  # the timer changes as time passes
 
     # method to generate background of timer
     def generate_background(self):
@@ -47,8 +49,24 @@ class DynamicTimer(frame.Drawable):
             seconds = "0" + seconds
         return minutes + ":" + seconds
 
+    # returns what the timer shows (interval, angle of the bar and text), which changes as time passes
+    def get_state(self):
+        time_passed = time.time() - self.start_time
+        fraction_gained = time_passed / self.time_interval_list[self.current_interval]
+        return (self.current_interval, min(int(fraction_gained * 360), 360),
+                self.create_text(self.time_interval_list[self.current_interval] - time_passed))
+
+    # marks the timer to be drawn again when what it shows has changed
+    def process(self, click_bool, release_bool, mouse_pos, used_process):
+        if self.visible:
+            frame.keep_animating()
+            if self.get_state() != self.drawn_state:
+                self.mark_changed()
+        return used_process
+
     def draw(self, win):
         if self.visible:
+            self.drawn_state = self.get_state()
             if self.layout_type == frame.RELATIVE:
                 self.set_relative_rect()
             x, y = self.get_center()
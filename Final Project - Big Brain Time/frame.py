@@ -7,6 +7,7 @@
 #   such as menus and game screens.
 # --------------------------------------------------------------------
 
+import bisect
 import pygame
 import vector
 import color as c
@@ -16,8 +17,129 @@ FIXED = 0
 RELATIVE = 1
 WRAP = 0
 MATCH = 1
+SETTLE_PASSES = 10  # most times a rect is worked out in a row while waiting for it to stop changing
+SOLVE_PASSES = 3  # most times a component tree is laid out in a row while laying it out changes it (such as new list rows)
+GRID_CELL_SIZE = 50  # width and height of the cells of a HitGrid
+SCROLL_STEP = 20  # pixels scrolled for each turn of the mouse wheel
+SCROLL_EASING = 0.5  # part of the distance left to scroll that is scrolled each frame
+BASE_LAYER = 0  # drawn in place in the component tree
+OVERLAY_LAYER = 1  # drawn over the page (such as the tool bar and the timer panel)
+MENU_LAYER = 2  # drawn over everything (such as drop down menus)
+
+dirty_rects = []  # areas of the window that have changed since they were last drawn
+all_dirty = True  # True if the whole window has to be drawn again
+drawing_rects = None  # areas of the window being drawn this frame (None for the whole window), see take_dirty_rects
+scrolled_areas = []  # (area, distance) of the areas of the window to move down before drawing, see mark_scrolled
+animating = False  # True if something on screen changes without any events (reset by the main loop every frame)
+layout_version = 0  # changed whenever the layout of drawables may have changed, see invalidate_layout
+layout_passes = 0  # number of drawable rects worked out (reset by the main loop every frame)
+
+
+# marks an area (x, y, w, h) of the window to be drawn again
+def mark_dirty(rect):
+    dirty_rects.append(pygame.Rect(rect).inflate(2, 2))
+
+
+# moves an area (x, y, w, h) of the window down by dy (up if negative) before it is next drawn, for scrolled contents
+# (anything drawn over the area that does not move with it has to be marked dirty as well)
+def mark_scrolled(rect, dy):
+    scrolled_areas.append((pygame.Rect(rect), dy))
+
+
+# moves the scrolled areas of the window, marking the parts uncovered by moving to be drawn
+# areas already marked dirty in a scrolled area are marked again where they were moved to
+def move_scrolled_areas(win):
+    global scrolled_areas
+    if not all_dirty:
+        for rect, dy in scrolled_areas:
+            rect = rect.clip(win.get_rect())
+            if abs(dy) >= rect.h:
+                mark_dirty(rect)
+                continue
+            win.set_clip(rect)
+            win.scroll(0, dy)
+            win.set_clip(None)
+            for dirty_rect in dirty_rects[:]:
+                if dirty_rect.colliderect(rect):
+                    dirty_rects.append(dirty_rect.move(0, dy))
+            if dy > 0:
+                mark_dirty((rect.x, rect.y, rect.w, dy))
+            else:
+                mark_dirty((rect.x, rect.bottom + dy, rect.w, -dy))
+    scrolled_areas = []
+
+
+# marks the whole window to be drawn again
+def mark_all_dirty():
+    global all_dirty
+    all_dirty = True
+
+
+# asks for the main loop to keep running at full frame rate, for drawables that change without any events
+def keep_animating():
+    global animating
+    animating = True
 
-top_drawables = []
+
+# makes every drawable work out its rect again the next time it is needed
+# (for when the window is resized, a layout property changes, or content is added or removed)
+def invalidate_layout():
+    global layout_version
+    layout_version += 1
+
+
+# returns list of the areas of the window to draw again (None for the whole window), and forgets them
+def take_dirty_rects():
+    global dirty_rects, all_dirty, drawing_rects
+    rects = None if all_dirty else dirty_rects
+    drawing_rects = rects
+    dirty_rects = []
+    all_dirty = False
+    return rects
+
+
+# class for drawing drawables over the rest of the window
+class Layers:
+    """drawables drawn over the component tree, in layers above BASE_LAYER (higher layers over lower ones)
+    each layer keeps its drawables in the order they were added, as the keys of a dictionary
+    layered drawables are drawn after the component tree from the bottom up, and processed before it from the top down"""
+    def __init__(self):
+        self.layers = dict()  # layer:dictionary of drawable:None
+        self.drawables = []  # every layered drawable in the order they are drawn
+        self.positions = dict()  # drawable:position in the order they are processed
+
+    # moves a drawable to a layer (BASE_LAYER to draw it in place again)
+    def move(self, drawable, layer):
+        if drawable.layer == layer:
+            return
+        if drawable.layer != BASE_LAYER:
+            del self.layers[drawable.layer][drawable]
+        drawable.layer = layer
+        if layer != BASE_LAYER:
+            self.layers.setdefault(layer, dict())[drawable] = None
+        self.update_order()
+        mark_all_dirty()
+
+    # takes the drawables in a component out of their layers (for when the component is cleared)
+    def remove_inside(self, component):
+        for drawable in self.drawables:
+            parent = drawable.parent
+            while isinstance(parent, Drawable):
+                if parent is component:
+                    self.move(drawable, BASE_LAYER)
+                    break
+                parent = parent.parent
+
+    def update_order(self):
+        self.drawables = []
+        for layer in sorted(self.layers):
+            self.drawables += self.layers[layer]
+        self.positions = dict()
+        for drawable in self.drawables[::-1]:
+            self.positions[drawable] = len(self.positions)
+
+
+layers = Layers()
 
 
 # frame class for storing and processing current drawables and buttons
@@ -68,6 +190,11 @@ class RelativeLayout:
         self.align_left = None
         self.align_right = None
 
+    # any change to the layout attributes moves drawables
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        invalidate_layout()
+
     def set_margin(self, value):
         self.margin_left = value
         self.margin_right = value
@@ -90,72 +217,178 @@ class Drawable:
             self.rect = vector.Rect(0, 0, 10, 10)
             self.get_w = self.get_w_default
             self.get_h = self.get_h_default
+        self.layout_version = None  # value of layout_version when the rect was last worked out
         self.layout_type = layout_type
         self.layout = RelativeLayout()
-        self.draw_top = False
+        self.layer = BASE_LAYER  # see Layers, changed with set_layer
+        self.processes_everywhere = False  # True if processed every frame wherever the mouse is (see needs_processing)
         self.w_fraction = 1
         self.h_fraction = 1
 
+    # --------------------LAYOUT PROPERTIES--------------------
+    # setting any of these changes the layout of the drawable
+
+    @property
+    def layout_type(self):
+        return self._layout_type
+
+    @layout_type.setter
+    def layout_type(self, value):
+        self._layout_type = value
+        invalidate_layout()
+
+    @property
+    def w_fraction(self):
+        return self._w_fraction
+
+    @w_fraction.setter
+    def w_fraction(self, value):
+        self._w_fraction = value
+        invalidate_layout()
+
+    @property
+    def h_fraction(self):
+        return self._h_fraction
+
+    @h_fraction.setter
+    def h_fraction(self, value):
+        self._h_fraction = value
+        invalidate_layout()
+
     def set_parent(self, parent):
         self.parent = parent
+        invalidate_layout()
 
     def set_layout_type(self, layout_type):
         self.layout_type = layout_type
 
+    def set_layer(self, layer):
+        layers.move(self, layer)
+
+    # returns True if the rect was worked out since the layout last changed
+    def layout_valid(self):
+        return self.layout_version == layout_version
+
+    # works out the rect from the relative layout, unless it is still valid
+    # some layouts depend on the drawable's own last rect (such as a MATCH height with centery gravity), so they
+    # settle over a few passes; the rect is only kept once a pass leaves it the same
+    # (drawables in a component tree are laid out ahead of time by its LayoutSolver, so this is only needed for others)
     def set_relative_rect(self):
+        global layout_passes
+        if self.layout_type == RELATIVE and not self.layout_valid():
+            layout_passes += 1
+            last_rect = self.rect.get()
+            self.work_out_rect()
+            self.layout_version = layout_version
+            if self.rect.get() != last_rect:  # drawables laid out from this one have to be worked out again
+                invalidate_layout()
+
+    # works out the rect, for when everything it is laid out from is already worked out
+    # (a rect laid out from itself is worked out until it stops changing)
+    def settle_rect(self):
+        global layout_passes
         if self.layout_type == RELATIVE:
-            if self.layout.align_top is not None:
-                drawable = self.parent.find(self.layout.align_top)
-                self.rect.y = drawable.get_y() + drawable.get_h() + drawable.layout.margin_bottom + self.layout.margin_top
-            elif self.layout.align_bottom is not None:
-                drawable = self.parent.find(self.layout.align_bottom)
-                self.rect.y = drawable.get_y() - self.get_h() - self.layout.margin_bottom - drawable.layout.margin_top
-            elif "top" in self.layout.gravity:
-                self.rect.y = self.parent.get_y() + self.layout.margin_top
-            elif "bottom" in self.layout.gravity:
-                self.rect.y = self.parent.get_y() + self.parent.get_h() - self.layout.margin_bottom - self.get_h()
-            elif "centery" in self.layout.gravity:
-                self.rect.y = self.parent.get_y() + (self.parent.get_h() - self.get_h())//2
-            else:
-                self.rect.y = self.parent.get_y()
-            self.rect.y += self.layout.margin_top
-            if self.layout.align_left is not None:
-                drawable = self.parent.find(self.layout.align_left)
-                self.rect.x = drawable.get_x() + drawable.get_w() + drawable.layout.margin_right + self.layout.margin_left
-            elif self.layout.align_right is not None:
-                drawable = self.parent.find(self.layout.align_right)
-                self.rect.x = drawable.get_x() - self.get_w() - self.layout.margin_right - drawable.layout.margin_left
-            elif "left" in self.layout.gravity:
-                self.rect.x = self.parent.get_x() + self.layout.margin_left
-            elif "right" in self.layout.gravity:
-                self.rect.x = self.parent.get_x() + self.parent.get_w() - self.layout.margin_right - self.get_w()
-            elif "centerx" in self.layout.gravity:
-                self.rect.x = self.parent.get_x() + (self.parent.get_w() - self.get_w())//2
+            if not self.depends_on_own_rect():
+                layout_passes += 1
+                self.work_out_rect()
             else:
-                self.rect.x = self.parent.get_x()
-            self.rect.x += self.layout.margin_left
-
-            if self.layout.w == MATCH:
-                if self.w_fraction is not 1:
-                    self.rect.w = int((self.parent.get_w() - self.layout.margin_left - self.layout.margin_right) / self.w_fraction)
-                elif self.get_x() != self.parent.get_x():
-                    self.rect.w = self.parent.get_w() - self.layout.margin_left - self.layout.margin_right - self.rect.x + self.parent.get_x()
-                else:
-                    self.rect.w = self.parent.get_w()
+                for i in range(SETTLE_PASSES):
+                    layout_passes += 1
+                    last_rect = self.rect.get()
+                    self.work_out_rect()
+                    if self.rect.get() == last_rect:
+                        break
+        else:  # only MATCH sizes need working out
+            self.get_w()
+            self.get_h()
+        self.layout_version = layout_version
+
+    # returns True if the position is worked out from a MATCH size, which is worked out from the position
+    def depends_on_own_rect(self):
+        layout = self.layout
+        if layout.h == MATCH and layout.align_top is None and (layout.align_bottom is not None or "top" not in layout.gravity and
+                                                               ("bottom" in layout.gravity or "centery" in layout.gravity)):
+            return True
+        return layout.w == MATCH and layout.align_left is None and (layout.align_right is not None or "left" not in layout.gravity and
+                                                                     ("right" in layout.gravity or "centerx" in layout.gravity))
+
+    # works out the rect from the relative layout, using the parent and aligned siblings as they are
+    def work_out_rect(self):
+        if self.layout.align_top is not None:
+            drawable = self.parent.find(self.layout.align_top)
+            self.rect.y = drawable.get_y() + drawable.get_h() + drawable.layout.margin_bottom + self.layout.margin_top
+        elif self.layout.align_bottom is not None:
+            drawable = self.parent.find(self.layout.align_bottom)
+            self.rect.y = drawable.get_y() - self.get_h() - self.layout.margin_bottom - drawable.layout.margin_top
+        elif "top" in self.layout.gravity:
+            self.rect.y = self.parent.get_y() + self.layout.margin_top
+        elif "bottom" in self.layout.gravity:
+            self.rect.y = self.parent.get_y() + self.parent.get_h() - self.layout.margin_bottom - self.get_h()
+        elif "centery" in self.layout.gravity:
+            self.rect.y = self.parent.get_y() + (self.parent.get_h() - self.get_h())//2
+        else:
+            self.rect.y = self.parent.get_y()
+        self.rect.y += self.layout.margin_top
+        if self.layout.align_left is not None:
+            drawable = self.parent.find(self.layout.align_left)
+            self.rect.x = drawable.get_x() + drawable.get_w() + drawable.layout.margin_right + self.layout.margin_left
+        elif self.layout.align_right is not None:
+            drawable = self.parent.find(self.layout.align_right)
+            self.rect.x = drawable.get_x() - self.get_w() - self.layout.margin_right - drawable.layout.margin_left
+        elif "left" in self.layout.gravity:
+            self.rect.x = self.parent.get_x() + self.layout.margin_left
+        elif "right" in self.layout.gravity:
+            self.rect.x = self.parent.get_x() + self.parent.get_w() - self.layout.margin_right - self.get_w()
+        elif "centerx" in self.layout.gravity:
+            self.rect.x = self.parent.get_x() + (self.parent.get_w() - self.get_w())//2
+        else:
+            self.rect.x = self.parent.get_x()
+        self.rect.x += self.layout.margin_left
+
+        if self.layout.w == MATCH:
+            if self.w_fraction is not 1:
+                self.rect.w = int((self.parent.get_w() - self.layout.margin_left - self.layout.margin_right) / self.w_fraction)
+            elif self.get_x() != self.parent.get_x():
+                self.rect.w = self.parent.get_w() - self.layout.margin_left - self.layout.margin_right - self.rect.x + self.parent.get_x()
             else:
-                self.get_w()
-            if self.layout.h == MATCH:
-                if self.h_fraction is not 1:
-                    self.rect.w = int((self.parent.get_h() - self.layout.margin_top - self.layout.margin_bottom + self.parent.get_y()) / self.h_fraction)
-                elif self.get_y() != self.parent.get_y():
-                    self.rect.h = self.parent.get_h() - self.layout.margin_top - self.layout.margin_bottom - self.rect.y + self.parent.get_y()
-                else:
-                    self.rect.h = self.parent.get_h()
+                self.rect.w = self.parent.get_w()
+        else:
+            self.get_w()
+        if self.layout.h == MATCH:
+            if self.h_fraction is not 1:
+                self.rect.w = int((self.parent.get_h() - self.layout.margin_top - self.layout.margin_bottom + self.parent.get_y()) / self.h_fraction)
+            elif self.get_y() != self.parent.get_y():
+                self.rect.h = self.parent.get_h() - self.layout.margin_top - self.layout.margin_bottom - self.rect.y + self.parent.get_y()
             else:
-                self.rect.h = self.get_h()
+                self.rect.h = self.parent.get_h()
+        else:
+            self.rect.h = self.get_h()
 
     def update_screen(self, new_win):
         self.parent = new_win
+        invalidate_layout()
+
+    # returns the area of the window the drawable draws to
+    def get_drawn_rect(self):
+        return pygame.Rect(self.get_rect())
+
+    # marks the area the drawable draws to be drawn again, for when the way it looks changes
+    def mark_changed(self):
+        if self.parent is not None or self.layout_type == FIXED:
+            mark_dirty(self.get_drawn_rect())
+        self.drop_caches()
+
+    # drops the copies of the cached components the drawable is in, as they no longer look the same (see Component.draw)
+    def drop_caches(self):
+        parent = self.parent
+        while isinstance(parent, Component):
+            parent.cache = None
+            parent = parent.parent
+
+    # returns True if the drawable has to be processed next frame even if the mouse is not over it
+    # (such as drawables that change as time passes or react to clicks anywhere)
+    def needs_processing(self):
+        return self.processes_everywhere
 
     # --------------------SETTER AND GETTER METHODS--------------------
 
@@ -166,7 +399,7 @@ class Drawable:
         return self.rect.y
 
     def get_w_default(self):
-        if self.layout.w == MATCH:
+        if self.layout.w == MATCH and not self.layout_valid():
             if self.w_fraction is not 1:
                 self.rect.w = int((self.parent.get_w() - self.layout.margin_left - self.layout.margin_right) / self.w_fraction)
             elif self.get_x() != self.parent.get_x():
@@ -176,7 +409,7 @@ class Drawable:
         return self.rect.w
 
     def get_h_default(self):
-        if self.layout.h == MATCH:
+        if self.layout.h == MATCH and not self.layout_valid():
             if self.h_fraction is not 1:
                 self.rect.w = int((self.parent.get_h() - self.layout.margin_top - self.layout.margin_bottom + self.parent.get_y()) / self.h_fraction)
             elif self.get_y() != self.parent.get_y():
@@ -194,6 +427,7 @@ class Drawable:
         self.rect.y = 0
         self.parent = parent
         parent.add(self)
+        invalidate_layout()
 
 
 # concrete component class to store drawable groups
@@ -207,8 +441,19 @@ class Component(Drawable):
         self.background = self.blank_background
         self.scrollable = False
         self.scroll_y = 0
+        self.scroll_left = 0  # distance left to scroll, see scroll_step
+        self.content_h = 0  # height of the contents from the top of the component, see fit_content
+        self.content_bottoms = dict()  # drawable:bottom of the drawable from the top of the component, see fit_content
+        self.cached = False  # True to draw the component by copying how it was last drawn, see draw
+        self.cache = None  # copy of the window where the component was last drawn, dropped when anything in it changes
+        self.data = dict()  # for storing data custom to the component
+        self.layout_solver = None
+        self.hit_grid = None
         if type(parent) is not pygame.Surface:
             parent.add(self)
+        else:  # the component filling the window lays out and processes everything in it
+            self.layout_solver = LayoutSolver(self)
+            self.hit_grid = HitGrid(self)
 
     @staticmethod
     def blank_background(self, win):
@@ -217,50 +462,96 @@ class Component(Drawable):
     def get_y_default(self):
         return self.rect.y + self.scroll_y
 
+    # adds the turns of the mouse wheel to the distance left to scroll
     def scroll(self, events):
-        down = 0
         for event in events:
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 4:
-                    self.scroll_y += 20
+                    self.scroll_left += SCROLL_STEP
                 elif event.button == 5:
-                    self.scroll_y -= 20
-                    down = 1
-        too_low = True
-        too_high = True
-        lowest = 0
-        coord_above = 0
+                    self.scroll_left -= SCROLL_STEP
+
+    # scrolls part of the distance left, so scrolling slows to a stop over a few frames
+    # what was drawn is moved instead of drawing the contents again, except where it was uncovered or drawn over
+    # the contents are moved by the distance scrolled instead of being laid out again (see move_contents)
+    def scroll_step(self):
+        step = int(self.scroll_left * SCROLL_EASING) or self.scroll_left
+        scroll_y = min(max(self.scroll_y + step, self.get_h() - self.content_h), 0)
+        if scroll_y == self.scroll_y + step:
+            self.scroll_left -= step
+        else:  # reached the top or bottom of the contents
+            self.scroll_left = 0
+        if scroll_y != self.scroll_y:
+            for rect in self.covering_rects():
+                mark_dirty(rect)
+            mark_scrolled((self.rect.x, self.rect.y, self.get_w(), self.get_h()), scroll_y - self.scroll_y)
+            self.move_contents(scroll_y - self.scroll_y)
+            self.scroll_y = scroll_y
+        if self.scroll_left:
+            keep_animating()
+
+    # moves the drawables laid out from the component down by dy, as laying them out again would
+    # (their layouts stay valid, and the HitGrid finds them by how far their components have scrolled)
+    def move_contents(self, dy):
         for item in self.contents:
-            coord_above = item.get_y() + item.get_h()
-            if coord_above > self.get_y() + self.get_h() - self.scroll_y:
-                too_high = False
-            elif coord_above < lowest:
-                lowest = coord_above
-        if too_high:
-            self.scroll_y = self.get_y() + self.get_h() - coord_above + 20*down
-
-        if self.scroll_y > 0:
-            self.scroll_y = 0
+            if self.positions(item):
+                item.rect.y += dy
+                if isinstance(item, Component):
+                    item.move_contents(dy)
+
+    # returns True if a drawable in the component is positioned from the component, so it moves when it scrolls
+    def positions(self, item):
+        return item.layout_type == RELATIVE
+
+    # keeps content_h up to date as a drawable in the component is laid out
+    # the height is only found from every drawable again when the lowest one moves up
+    def fit_content(self, item):
+        bottom = item.get_y() + item.get_h() - self.get_y()
+        last_bottom = self.content_bottoms.get(item)
+        if bottom == last_bottom:
+            return
+        self.content_bottoms[item] = bottom
+        if bottom > self.content_h:
+            self.content_h = bottom
+        elif last_bottom == self.content_h:
+            self.content_h = max(self.content_bottoms.values())
+
+    # returns list of the areas drawn over the component that do not scroll with it
+    # (the drawables after it and after the components it is in, and layered drawables)
+    def covering_rects(self):
+        rects = [d.get_drawn_rect() for d in layers.drawables]
+        child = self
+        while isinstance(child.parent, Component):
+            contents = child.parent.contents
+            rects += [d.get_drawn_rect() for d in contents[contents.index(child) + 1:]]
+            child = child.parent
+        view = pygame.Rect(self.rect.x, self.rect.y, self.get_w(), self.get_h())
+        return [rect for rect in rects if rect.colliderect(view)]
 
     def clear(self):
+        for item in self.contents:
+            if hasattr(item, 'release_rows') and callable(getattr(item, 'release_rows')):
+                item.release_rows()
+        layers.remove_inside(self)
         self.contents = []
+        self.content_h = 0
+        self.content_bottoms = dict()
+        self.scroll_left = 0
+        invalidate_layout()
 
     def default_background(self, win):
         pygame.draw.rect(win, self.background_color, self.get_rect())
 
+    # the component filling the window only processes the drawables its HitGrid finds
     def process(self, click_bool, release_bool, mouse_pos, used_process):
-        global top_drawables
-        if type(self.parent) is pygame.Surface:
-            for item in top_drawables:
-                if hasattr(item, 'process') and callable(getattr(item, 'process')):
-                    used_process = item.process(click_bool, release_bool, mouse_pos, used_process)
+        if self.layout_solver is not None:
+            self.layout_solver.solve()
+            return self.hit_grid.process(click_bool, release_bool, mouse_pos, used_process)
 
         for item in self.contents[::-1]:
-            if item not in top_drawables:
+            if item.layer == BASE_LAYER:
                 if hasattr(item, 'process') and callable(getattr(item, 'process')):
                     used_process = item.process(click_bool, release_bool, mouse_pos, used_process)
-        if type(self.parent) is pygame.Surface:
-            top_drawables = []
         return used_process
 
     def is_hovered(self, mouse_pos):
@@ -272,28 +563,298 @@ class Component(Drawable):
         for d in self.contents:
             if hasattr(d, 'process_focus') and callable(getattr(d, 'process_focus')):
                 d.process_focus(events, keys)
-        if self.is_hovered(pygame.mouse.get_pos()) and self.scrollable:
-            self.scroll(events)
+        if self.scrollable:
+            if self.is_hovered(pygame.mouse.get_pos()):
+                self.scroll(events)
+            if self.scroll_left:
+                self.scroll_step()
 
     def add(self, item):
         self.contents.append(item)
+        invalidate_layout()
+
+    def get_drawn_rect(self):
+        return pygame.Rect(self.get_rect()).unionall([item.get_drawn_rect() for item in self.contents])
 
     # function to find drawables for relative layout
     def find(self, ind):
         return self.contents[ind]
 
     # function to draw component and all its content
+    # a cached component is copied from where it was last drawn, until it changes size or something in it changes
+    # (everything that changes how it looks calls mark_changed), or the whole window is drawn again
+    # only for components drawing nothing outside their own rect, as only that rect is copied (and they are not drawn
+    # at all when the area being drawn is elsewhere)
     def draw(self, win):
+        if self.layout_solver is not None:
+            self.layout_solver.solve()
         if self.layout_type == RELATIVE:
             self.set_relative_rect()
+        if self.cached and not win.get_clip().colliderect(self.get_rect()):
+            return  # none of it is being drawn
+        if self.cache is not None:
+            if self.cache_valid():
+                win.blit(self.cache, self.get_rect()[:2])
+                return
+            self.cache = None
+        self.draw_contents(win)
+        if self.cached:
+            self.update_cache(win)
+
+    # the copy is drawn wherever the component is now, as moving it (such as by scrolling) does not change how it looks
+    def cache_valid(self):
+        return drawing_rects is not None and self.cache.get_size() == (self.get_w(), self.get_h())
+
+    def drop_caches(self):
+        self.cache = None
+        super().drop_caches()
+
+    # copies the component from the window, if the whole of it was just drawn
+    def update_cache(self, win):
+        rect = pygame.Rect(self.get_rect())
+        if win.get_rect().contains(rect) and win.get_clip().contains(rect):
+            self.cache = win.subsurface(rect).copy()
+
+    def draw_contents(self, win):
         self.default_background(win)
         self.background(self, win)
-        global top_drawables
         for item in self.contents:
-            if item.draw_top:
-                top_drawables.append(item)
-            else:
+            if item.layer == BASE_LAYER:
                 item.draw(win)
         if type(self.parent) is pygame.Surface:
-            for d in top_drawables:
+            for d in layers.drawables:
                 d.draw(win)
+
+
+# component for long lists, only making the rows that can be seen
+class ListComponent(Component):
+    """component showing a list of items as rows, one under the other
+    rows are made by make_row(list component, item) when they scroll into the parent's view and
+    dropped when they scroll out of it, so only the rows on screen exist and are drawn
+    dropped rows are given to release_row(row, item) if it is set, so they can be reused (see RowPool)"""
+    def __init__(self, parent, items, make_row, row_height, spacing=0, background_color=c.WHITE, release_row=None):
+        super().__init__(parent, RELATIVE, background_color)
+        self.items = items
+        self.make_row = make_row
+        self.release_row = release_row
+        self.rows = dict()  # item index:row
+        self.offsets = [0]  # distance from the top of the list to the top of each row
+        for item in items:
+            self.offsets.append(self.offsets[-1] + row_height(item) + spacing)
+        self.rect.h = self.offsets[-1]
+
+    # returns the first and last (exclusive) indexes of the rows within the parent's view
+    def visible_range(self):
+        top = self.parent.rect.y - self.get_y()
+        bottom = top + self.parent.get_h()
+        start = max(bisect.bisect_right(self.offsets, top) - 1, 0)
+        end = min(bisect.bisect_left(self.offsets, bottom), len(self.items))
+        return start, end
+
+    # makes the rows that have come into view, drops the ones that have left it, and positions them
+    def update_rows(self):
+        start, end = self.visible_range()
+        rows = dict()
+        for i in range(start, end):
+            if i in self.rows:
+                rows[i] = self.rows[i]
+            else:
+                rows[i] = self.make_row(self, self.items[i])
+                rows[i].layout_type = FIXED
+        if self.release_row is not None:
+            for i in self.rows:
+                if i not in rows:
+                    self.release_row(self.rows[i], self.items[i])
+        self.rows = rows
+        self.contents = list(rows.values())
+        for i, row in rows.items():
+            x, y, w = self.get_x(), self.get_y() + self.offsets[i], self.get_w()
+            if (row.rect.x, row.rect.y, row.rect.w) != (x, y, w):  # the row's contents have to be laid out again
+                row.rect.x, row.rect.y, row.rect.w = x, y, w
+                invalidate_layout()
+                # laid out straight away, as rows scrolled into view are drawn before the tree is next laid out
+                LayoutSolver.lay_out_contents(row)
+
+    # rows are placed by the list itself, so they all move with it
+    def positions(self, item):
+        return True
+
+    # drops every row, as when the list is taken off the screen
+    def release_rows(self):
+        if self.release_row is not None:
+            for i in self.rows:
+                self.release_row(self.rows[i], self.items[i])
+        self.rows = dict()
+        self.contents = []
+        invalidate_layout()
+
+    def draw(self, win):
+        if self.layout_type == RELATIVE:
+            self.set_relative_rect()
+        self.update_rows()
+        super().draw(win)
+
+
+# class for laying out a whole component tree at once
+class LayoutSolver:
+    """works out the rect of every drawable in a component tree in one pass, in dependency order:
+    each component before its contents, and each drawable after the siblings it is aligned to
+    the rects are kept on the drawables (drawing and the HitGrid read them from there), and are only worked out
+    again once the layout has changed (see invalidate_layout)"""
+    def __init__(self, root):
+        self.root = root
+        self.version = None  # layout_version the rects were worked out for
+
+    # lays out the tree if the layout has changed since it was last laid out
+    def solve(self):
+        for i in range(SOLVE_PASSES):
+            if self.version == layout_version:
+                return
+            self.version = layout_version
+            self.lay_out_contents(self.root)
+
+    # lays out the contents of a component, and everything in them
+    @classmethod
+    def lay_out_contents(cls, component):
+        if isinstance(component, ListComponent):
+            component.update_rows()  # the rows on screen are made and placed by the list itself
+        for item in cls.dependency_order(component.contents):
+            item.settle_rect()
+            if isinstance(item, Component):
+                cls.lay_out_contents(item)
+            if component.scrollable:  # kept for scroll_step, as a list's height is known without its rows
+                component.fit_content(item)
+
+    # returns the contents ordered so that every drawable comes after the siblings it is aligned to
+    @staticmethod
+    def dependency_order(contents):
+        ordered = []
+        placed = [False] * len(contents)
+        for first in range(len(contents)):
+            if placed[first]:
+                continue
+            layout = contents[first].layout
+            if all(ind is None or placed[ind] for ind in (layout.align_top, layout.align_bottom,
+                                                          layout.align_left, layout.align_right)):
+                placed[first] = True  # nearly always, as drawables are aligned to the ones before them
+                ordered.append(contents[first])
+                continue
+            waiting = [first]
+            while waiting:
+                i = waiting[-1]
+                if placed[i]:
+                    waiting.pop()
+                    continue
+                layout = contents[i].layout
+                aligned_to = [ind % len(contents) for ind in (layout.align_top, layout.align_bottom,
+                                                              layout.align_left, layout.align_right) if ind is not None]
+                # siblings already waiting are aligned to this drawable as well, so they are left out of the loop
+                not_placed = [j for j in aligned_to if not placed[j] and j not in waiting]
+                if not_placed:
+                    waiting.extend(not_placed)
+                else:
+                    placed[i] = True
+                    ordered.append(contents[i])
+                    waiting.pop()
+        return ordered
+
+
+# class for finding the drawables under the mouse
+class HitGrid:
+    """uniform grid over the window, each cell listing the drawables that can be processed over it
+    each frame only the drawables in the cell under the mouse and the ones that still need processing
+    (see Drawable.needs_processing) are processed, in the order processing every drawable would go in:
+    layered drawables first (see Layers), then from the last drawn to the first
+    the grid is made again from the laid out rects whenever the layout has changed
+    scrolling does not change the layout, so drawables that scroll are listed where they were when the grid was made,
+    and looked for there by how far their scrollable components have scrolled since"""
+    def __init__(self, root):
+        self.root = root
+        self.cells = dict()  # (scrollable components the drawables move with, column, row):list of drawables over that cell
+        self.scrolls = dict()  # scrollable components drawables move with:how far they had scrolled when the grid was made
+        self.order = dict()  # drawable:(the drawable and the components it is in from the innermost, processing position)
+        self.engaged = set()  # drawables that needed processing after the last frame
+        self.version = None  # layout_version the grid was made for
+
+    def build(self):
+        self.cells = dict()
+        self.scrolls = {(): 0}
+        self.order = dict()
+        self.add_contents(self.root, (), (self.root,) if self.root.scrollable else ())
+        self.engaged = {item for item in self.order if item.needs_processing()}
+        self.version = self.root.layout_solver.version
+
+    # scrollers are the scrollable components the drawables positioned from the component move with
+    def add_contents(self, component, ancestors, scrollers):
+        for item in component.contents[::-1]:
+            item_scrollers = scrollers if component.positions(item) else ()
+            if isinstance(item, Component):
+                self.add_contents(item, (item,) + ancestors, item_scrollers + ((item,) if item.scrollable else ()))
+            elif hasattr(item, 'process') and callable(getattr(item, 'process')):
+                self.order[item] = ((item,) + ancestors, len(self.order))
+                self.add_to_cells(item, item_scrollers)
+
+    # drawables that scroll are listed below and above the window as well, for when they are scrolled into it
+    def add_to_cells(self, item, scrollers):
+        if scrollers not in self.scrolls:
+            self.scrolls[scrollers] = sum(component.scroll_y for component in scrollers)
+        x, y, w, h = item.rect.get()
+        last_column = min((x + w) // GRID_CELL_SIZE, self.root.get_w() // GRID_CELL_SIZE)
+        first_row, last_row = y // GRID_CELL_SIZE, (y + h) // GRID_CELL_SIZE
+        if not scrollers:
+            first_row, last_row = max(first_row, 0), min(last_row, self.root.get_h() // GRID_CELL_SIZE)
+        for column in range(max(x // GRID_CELL_SIZE, 0), last_column + 1):
+            for row in range(first_row, last_row + 1):
+                self.cells.setdefault((scrollers, column, row), []).append(item)
+
+    # returns (position among the layered drawables of the drawable or the component it is in, processing position)
+    def process_key(self, item):
+        ancestors, position = self.order[item]
+        for drawable in ancestors:
+            if drawable.layer != BASE_LAYER:
+                return layers.positions[drawable], position
+        return len(layers.positions), position
+
+    def process(self, click_bool, release_bool, mouse_pos, used_process):
+        if self.version != self.root.layout_solver.version:
+            self.build()
+        x, y = mouse_pos
+        items = set(self.engaged)
+        for scrollers, scroll_y in self.scrolls.items():
+            dy = sum(component.scroll_y for component in scrollers) - scroll_y
+            items.update(self.cells.get((scrollers, x // GRID_CELL_SIZE, (y - dy) // GRID_CELL_SIZE), []))
+        self.engaged = set()
+        for item in sorted((item for item in items if item in self.order), key=self.process_key):
+            used_process = item.process(click_bool, release_bool, mouse_pos, used_process)
+            if item.needs_processing():
+                self.engaged.add(item)
+        return used_process
+
+
+# class for reusing rows of list components
+class RowPool:
+    """keeps rows that are no longer shown, to show again for other items instead of making new rows
+    make_row(parent, item) makes a row and bind_row(row, item) changes a row to show another item
+    rows are only reused for items of the same type"""
+    def __init__(self, make_row, bind_row):
+        self.make_row = make_row
+        self.bind_row = bind_row
+        self.free = dict()  # item type:list of rows
+
+    # returns a row showing an item, reusing a free row if there is one
+    def get(self, parent, item):
+        rows = self.free.get(type(item))
+        if not rows:
+            return self.make_row(parent, item)
+        row = rows.pop()
+        row.set_parent(parent)
+        self.bind_row(row, item)
+        row.drop_caches()  # a cached row still shows the last item
+        return row
+
+    def release(self, row, item):
+        self.free.setdefault(type(item), []).append(row)
+
+    # forget every free row (such as when they would look different if made again)
+    def clear(self):
+        self.free = dict()
@@ -0,0 +1,186 @@
+# --------------------------------------------------------------------
+# Program: Change Journal
+# Description: Append only log of the changes made to folders and
+#   tasks. Each change is written as one small record instead of
+#   rewriting the save files, and the records are replayed on top of
+#   the save files when loading. Once the journal gets too long it is
+#   compacted by rewriting the save files and clearing the journal.
+#   Each record is written with the generation of the save files (see
+#   td.save_generation), so records already in the save files are not
+#   replayed again if the program stops before the journal is cleared.
+# --------------------------------------------------------------------
+
+import json
+import os
+import task_data as td
+
+JOURNAL_FILE = 'Change Journal.txt'
+COMPACT_LIMIT = 200  # number of records before the journal is compacted into the save files
+
+
+# class for appending and replaying change records
+class Journal:
+    """append only log of changes made to the folder tree"""
+    def __init__(self, file_name=JOURNAL_FILE, compact_limit=COMPACT_LIMIT):
+        self.file_name = file_name
+        self.compact_limit = compact_limit
+        self.length = 0  # records written since the last compaction
+
+    # write one change record to the end of the journal
+    def append(self, record):
+        self.append_all([record])
+
+    # write a list of change records to the end of the journal at once
+    # if the write fails, what was written is cut off again, so the records can be written again later
+    # (a partly written record would stop the records after it from being read)
+    def append_all(self, records):
+        data = "".join(json.dumps(dict(record, gen=td.save_generation)) + "\n" for record in records).encode()
+        fi = open(self.file_name, 'ab', buffering=0)
+        start = fi.seek(0, os.SEEK_END)
+        try:
+            written = 0
+            while written < len(data):
+                written += fi.write(data[written:])
+        except OSError:
+            fi.truncate(start)
+            raise
+        finally:
+            fi.close()
+        self.length += len(records)
+
+    # return list of the records in the journal that are not in the save files yet
+    # (records from before the save files were last rewritten are left out, as the journal is cleared after the
+    # save files are rewritten, and the program may have stopped in between)
+    def read(self):
+        records = []
+        if not os.path.exists(self.file_name):
+            return records
+        fi = open(self.file_name, 'r')
+        for line in fi.read().splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:  # last record was only partly written
+                break
+            if record.pop("gen", 0) >= td.save_generation:  # records from before generations were kept have none
+                records.append(record)
+        fi.close()
+        return records
+
+    # empty the journal (once its changes are in the save files)
+    def clear(self):
+        open(self.file_name, 'w').close()
+        self.length = 0
+
+    def needs_compaction(self):
+        return self.length >= self.compact_limit
+
+    # apply every record in the journal to the folder tree, returning the number of records
+    def replay(self, main_folder):
+        records = self.read()
+        if records:
+            td.load_all_contents(main_folder, self.load_contents)
+        for record in records:
+            apply_change(main_folder, record)
+        self.length = len(records)
+        return len(records)
+
+    # reads in the save files and applies any changes made since they were last saved
+    # when lazy, each folder's tasks are read in by load_contents when it is first opened
+    def load_folders(self, title, lazy=False):
+        main_folder = td.load_folders(title, lazy)
+        if self.replay(main_folder):
+            self.compact(main_folder)
+        return main_folder
+
+    @staticmethod
+    def load_contents(folder):
+        td.read_folder_tasks(folder)
+
+    # rewrite the save files with all changes and empty the journal
+    def compact(self, main_folder):
+        self.write_snapshot(self.snapshot(main_folder))
+
+    # returns a copy of the folders to be written by write_snapshot
+    # (the tasks of unopened folders are not read in, but copied from the old task file when it is written)
+    @staticmethod
+    def snapshot(main_folder):
+        return td.snapshot_folders(main_folder)
+
+    def write_snapshot(self, snapshot):
+        td.save_snapshot(snapshot)
+        self.clear()
+
+    @staticmethod
+    def save_user_data(user):
+        user.SaveData()
+
+    @staticmethod
+    def read_user_data(user):
+        user.ReadInData()
+
+
+# --------------------RECORDS--------------------
+
+def add_record(item):
+    if type(item) is td.Task:
+        return {"op": "add", "folder": td.folder_path(item.parent), "task": item.data}
+    return {"op": "add", "folder": td.folder_path(item.parent), "title": item.title}
+
+
+# must be created before the item is taken out of its folder
+def remove_record(item):
+    if type(item) is td.Task:
+        return {"op": "remove", "code": item.taskcode}
+    return {"op": "remove", "folder": td.folder_path(item)}
+
+
+def move_record(task, folder):
+    return {"op": "move", "code": task.taskcode, "folder": td.folder_path(folder)}
+
+
+def edit_record(task):
+    return {"op": "edit", "code": task.taskcode, "task": task.data}
+
+
+# --------------------REPLAYING--------------------
+
+# applies one change record to the folder tree
+def apply_change(main_folder, record):
+    if record["op"] == "add":
+        folder = td.find_folder(main_folder, record["folder"])
+        if "task" in record:
+            code, title, description, date, priority = record["task"]
+            if code in td.tasks_by_code:  # already in the save files
+                return
+            task = td.Task(code, title, description, date, int(priority), folder)
+            folder.add(task)
+            td.register_task(task)
+        else:
+            folder.add(td.Folder(record["title"], folder))
+    elif record["op"] == "remove":
+        if "code" in record:
+            task = td.tasks_by_code.get(record["code"])
+            if task is not None:
+                task.parent.remove(task)
+                td.unregister_task(task)
+        else:
+            folder = td.find_folder(main_folder, record["folder"])
+            folder.parent.remove(folder)
+    elif record["op"] == "move":
+        task = td.tasks_by_code[record["code"]]
+        td.unregister_task(task)
+        task.parent.remove(task)
+        task.parent = td.find_folder(main_folder, record["folder"])
+        task.parent.add(task)
+        td.register_task(task)
+    elif record["op"] == "edit":
+        task = td.tasks_by_code[record["code"]]
+        code, title, description, date, priority = record["task"]
+        td.unregister_task(task)
+        task.parent.remove(task)  # taken out while its sorting keys change
+        task.title = title
+        task.description = description
+        task.set_date(date)
+        task.priority = int(priority)
+        task.parent.add(task)
+        td.register_task(task)
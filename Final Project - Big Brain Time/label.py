@@ -5,6 +5,7 @@
 # Description: Classes for displaying text on a pygame surface.
 # --------------------------------------------------------------------
 
+import collections
 import pygame
 pygame.init()
 
@@ -15,6 +16,60 @@ TOP = 0
 BOTTOM = 1
 CENTER = 0.5
 
+fonts = dict()  # (font name, size):font, shared by every label (and so every button and input box)
+font_requests = 0  # number of times a font has been asked for
+font_lookups = 0  # number of times a font has been looked up in the system fonts (once for each new name and size)
+
+
+# returns a system font, only looking it up the first time each name and size is asked for
+def get_font(name, size):
+    global font_requests, font_lookups
+    font_requests += 1
+    font = fonts.get((name, size))
+    if font is None:
+        font_lookups += 1
+        font = fonts[(name, size)] = pygame.font.SysFont(name, size)
+    return font
+
+
+glyph_widths = dict()  # (character, font name, size):width, shared by every input box
+
+
+# returns the width of a character, only measuring it the first time each character, font and size is asked for
+def glyph_width(char, font, size):
+    width = glyph_widths.get((char, font, size))
+    if width is None:
+        width = glyph_widths[(char, font, size)] = get_font(font, size).size(char)[0]
+    return width
+
+
+TEXT_CACHE_BYTES = 8 * 1024 * 1024  # most pixel memory kept by the rendered text cache
+
+rendered_text = collections.OrderedDict()  # (text, font name, size, color, antialias):surface, least recently used first
+rendered_text_bytes = 0  # pixel memory of the surfaces in rendered_text
+text_requests = 0  # number of times text has been asked for
+text_renders = 0  # number of times text has been rendered (not found in the cache)
+
+
+# returns a surface with rendered text, reusing the surface from the last time the same text was rendered
+# the surface is shared, so it must not be drawn on
+# the least recently used text is forgotten once the surfaces take up more than TEXT_CACHE_BYTES
+def render_text(text, font, size, color, antialias=True):
+    global rendered_text_bytes, text_requests, text_renders
+    text_requests += 1
+    key = (text, font, size, tuple(color), antialias)
+    surface = rendered_text.get(key)
+    if surface is not None:
+        rendered_text.move_to_end(key)
+        return surface
+    text_renders += 1
+    surface = rendered_text[key] = get_font(font, size).render(text, antialias, color)
+    rendered_text_bytes += surface.get_pitch() * surface.get_height()
+    while rendered_text_bytes > TEXT_CACHE_BYTES and len(rendered_text) > 1:
+        old_surface = rendered_text.popitem(last=False)[1]
+        rendered_text_bytes -= old_surface.get_pitch() * old_surface.get_height()
+    return surface
+
 
 # scalable class for easily drawable text
 class Label:
@@ -34,7 +89,7 @@ class Label:
 
     # return rendered label's text as a drawable
     def render_label(self):
-        return pygame.font.SysFont(self.font, self.size).render(self.text, True, self.color)
+        return render_text(self.text, self.font, self.size, self.color)
 
     def center(self, xy):
         self.set_x(xy[0] - self.get_width()//2)
@@ -18,13 +18,14 @@ import color as c
 import button2 as b
 import dynamic_timer as timer
 import pygameplus as pgp
-import random
 import time
 from calendar import monthrange
 import datetime
-"""matplotlib functionality commented out"""
-# import matplotlib.pyplot as plt
-# plt.style.use('ggplot')
+import task_data as td
+import journal
+import database
+import autosave
+import assets
 
 
 # --------------------Classes--------------------
@@ -109,142 +110,8 @@ class Palette:
         add_button.set_hover_color(COLOR.dark1)
         add_button.set_hold_color(COLOR.light1)
         add_button.set_border_color(c.BLACK)
-
-
-# class for storing all task data
-class Task:
-    """stores all task data. can generate task codes"""
-    def __init__(self, code, title, description, duedate, priority, parentfolder):
-        self.title = title
-        self.taskcode = code
-        self.description = description
-        self.date = duedate
-        self.priority = priority
-        self.parent = parentfolder
-        self.data = [code, title, description, duedate, priority]
-
-    # generating task code for saving the task
-    @staticmethod
-    def generate_task_code():
-        char_code = None
-        chars = "1234567890!@#$%^&*()qwertyuiopasdfghjklzxcvbnmQWERTYUIOPASDGFHJKLZXCVBNM<>,.;:/?-_+="
-        char_list = list(chars)
-        # ensures task code is not a duplicate
-        while char_code in all_task_codes or char_code is None:
-            char_code = ""
-            for i in range(10):
-                char_code += random.choice(char_list)
-        return char_code
-
-
-# class for storing all folder data
-class Folder:
-    """stores all folder data, including contents"""
-    def __init__(self, title, parent=None):
-        self.title = title
-        self.contents = []
-        self.parent = parent
-
-    def add(self, item):
-        self.contents.append(item)
-
-    # add a task to the folder when reading in from file
-    def taskadd(self, code, parentfolder):
-        global fol
-        for i, line in enumerate(fol):
-            if line == code:
-                all_task_codes.append(code)
-                task = Task(fol[i], fol[i + 1], fol[i + 2], fol[i + 3], int(fol[i + 4]), parentfolder)
-                self.contents.append(task)
-                if task.date in all_task_date_dict:
-                    all_task_date_dict[task.date].append(task)
-                else:
-                    all_task_date_dict[task.date] = [task]
-                return
-
-
-# class for storing all user data for analytics
-class UserData:
-    """stores all user data for analytics
-    can display the data using matplotlib module"""
-    def __init__(self):
-        self.studysessions = []
-        self.taskscompleted = []
-        self.tasks_being_completed = 0
-
-    # add time spent doing a task
-    def Add_Time(self, time):
-        newtime = round(int(time) / 60, 1)
-        today = datetime.datetime.now()
-        date = str(today.day) + "/" + str(today.month)
-        for item in self.studysessions:
-            if item[0] == date:
-                item[1] += newtime
-                return
-        if len(self.studysessions) > 7:  # delete data older than 7 days
-            del (self.studysessions[0])
-        self.studysessions.append([date, time])
-
-    # add number of tasks completed
-    def Add_Tasks(self, taskcount):
-        today = datetime.datetime.now()
-        date = str(today.day) + "/" + str(today.month)
-        for item in self.taskscompleted:
-            if item[0] == date:
-                item[1] += taskcount#Adds task to current day count if current day already exists
-                return
-        if len(self.taskscompleted) > 7:  # delete data older than 7 days
-            del (self.taskcompleted[0])
-        self.taskscompleted.append([date, int(taskcount)])
-
-    # display bar graph with time spend studying
-    def DisplayStudyHours(self):
-        x = [pair[0] for pair in self.studysessions]
-        x_pos = [i for i in range(len(self.studysessions))]
-        y_pos = [pair[1] for pair in self.studysessions]
-        plt.bar(x_pos, y_pos, color='pink')
-        plt.xlabel("Date")
-        plt.ylabel("Study Hours")
-        plt.title("Study hours per day")
-        plt.xticks(x_pos, x)
-        plt.show()
-
-    # display bar graph with tasks completed
-    def DisplayTasksCompleted(self):
-        x = [pair[0] for pair in self.taskscompleted]
-        x_pos = [i for i in range(len(self.taskscompleted))]
-        y_pos = [pair[1] for pair in self.taskscompleted]
-        plt.bar(x_pos, y_pos, color='pink')
-        plt.xlabel("Date")
-        plt.ylabel("Tasks Completed")
-        plt.title("Day")
-        plt.xticks(x_pos, x)
-        plt.show()
-
-    # save data to text file
-    def SaveData(self):
-        fi = open("UserData.txt", 'w')
-        for item in self.studysessions:
-            fi.write(item[0] + "," + str(item[1]) + "\n")
-        fi.write("Tasks Completed\n")
-        for item in self.taskscompleted:
-            fi.write(item[0] + "," + str(item[1]) + "\n")
-        fi.close()
-
-    # read data in from text file
-    def ReadInData(self):
-        fi = open("UserData.txt", 'r')
-        alllines = fi.read().splitlines()
-        for i in range(len(alllines)):
-            if alllines[i] != "Tasks Completed":
-                line = alllines[i].split(",")
-                self.studysessions.append([line[0], float(line[1])])
-            else:
-                alllines = alllines[i + 1:]
-                for j in range(len(alllines)):
-                    line = alllines[j].split(",")
-                    self.taskscompleted.append([line[0], float(line[1])])
-                break
+        row_pool.clear()  # pooled rows have the old colours
+        frame.mark_all_dirty()
 
 
 # --------------------Functions--------------------
@@ -378,18 +245,15 @@ def add_task_or_folder(but):
                 if due_date[i] == "":
                     due_date[i] = "0"
             due_date = "/".join(due_date)
-            new_task = Task(Task.generate_task_code(), inputs[0], inputs[1], due_date, int(inputs[3]), current_folder)
+            new_task = td.Task(td.Task.generate_task_code(), inputs[0], inputs[1], due_date, int(inputs[3]), current_folder)
             current_folder.add(new_task)
-            # add task to date:task dictionary
-            if new_task.date in all_task_date_dict:
-                all_task_date_dict[new_task.date].append(new_task)
-            else:
-                all_task_date_dict[new_task.date] = [new_task]
+            td.register_task(new_task)  # add task to date:task dictionary
+            log_change(journal.add_record(new_task))
         else:
-            new_folder = Folder(inputs[0], current_folder)
+            new_folder = td.Folder(inputs[0], current_folder)
             current_folder.add(new_folder)
+            log_change(journal.add_record(new_folder))
         page_component.scrollable = True
-        save_work()
 
         reset_page_window()
 
@@ -425,10 +289,8 @@ def load_folder_page(folder):
     sort_button.set_visibility(True)
     sort_button.set_active(True)
 
-    if sort_button.text == "Date":
-        folder.contents = sortbydate(folder.contents)
-    else:
-        folder.contents = sortbypriority(folder.contents)
+    if folder.unloaded is not None:  # first time opening the folder
+        storage.load_contents(folder)
 
     global selected_tasks
     selected_tasks = []
@@ -442,23 +304,40 @@ def load_folder_page(folder):
     page_component.scrollable = True
     global current_folder
     current_folder = folder  # set new current folder
-    ind = -1
-    for item in folder.contents:
-        if type(item) is Folder:
-            box = template_folder_box(page_component, item)
-        else:
-            box = template_task_box(page_component, item)
-        box.layout.margin_bottom = 5
-        if ind >= 0:
-            box.layout.align_top = ind
-        ind += 1
+    # only the rows that can be seen are made, so large folders open straight away
+    # rows of the last page are reused from the row pool
+    folder_list = frame.ListComponent(page_component, folder.sorted_contents(sort_button.text == "Date"),
+                                      row_pool.get, box_height, 5, COLOR.light1, row_pool.release)
+    folder_list.layout.w = frame.MATCH
+
+
+# returns a component for displaying a folder or task
+def template_box(parent, item):
+    if type(item) is td.Folder:
+        return template_folder_box(parent, item)
+    return template_task_box(parent, item)
+
+
+# changes a component made by template_box to display another folder or task of the same type
+def bind_box(component, item):
+    if type(item) is td.Folder:
+        bind_folder_box(component, item)
+    else:
+        bind_task_box(component, item)
+
+
+def box_height(item):
+    if type(item) is td.Folder:
+        return FOLDER_BOX_HEIGHT
+    return TASK_BOX_HEIGHT
 
 
 # returns a component for displaying a task containing all of the information from the task
 def template_folder_box(parent, folder):
     component = frame.Component(parent, frame.RELATIVE, COLOR.light2)
     component.layout.w = frame.MATCH
-    component.rect.h = 70
+    component.rect.h = FOLDER_BOX_HEIGHT
+    component.cached = True  # drawn as one copy until hovered or changed
 
     full_button = b.Button()
     full_button.set_relative(component)
@@ -470,17 +349,20 @@ def template_folder_box(parent, folder):
     full_button.set_border(0)
     full_button.on_release = load_folder_page_on_click
     full_button.data["parent_folder"] = folder
+    component.data["button"] = full_button
 
-    folder_icon = pgp.Drawable((60, 60))
+    folder_icon = pgp.Drawable(assets.image("foldericon.png"))
     folder_icon.set_relative(component)
     folder_icon.layout.gravity = "left top"
-    folder_icon.surface.blit(pygame.image.load("foldericon.png"), (10, 18))
+    folder_icon.layout.margin_left = 5  # margins are added twice with "left top" gravity, so drawn at (10, 18)
+    folder_icon.layout.margin_top = 9
 
     title = pgp.Label(folder.title)
     title.set_relative(component)
     title.set_size(35)
     title.layout.gravity = "centery"
     title.layout.margin_left = 65
+    component.data["title"] = title
 
     arrow = pgp.Label(">")
     arrow.set_relative(component)
@@ -491,11 +373,21 @@ def template_folder_box(parent, folder):
     return component
 
 
+# changes a component made by template_folder_box to display another folder
+# text is only rendered again if it has changed
+def bind_folder_box(component, folder):
+    component.data["button"].data["parent_folder"] = folder
+    component.data["button"].on_release_default()
+    if component.data["title"].text != folder.title:
+        component.data["title"].set_text(folder.title)
+
+
 # returns a component for displaying a task containing all of the information from the task
 def template_task_box(parent, task):
     component = frame.Component(parent, frame.RELATIVE, COLOR.light2)
     component.layout.w = frame.MATCH
-    component.rect.h = 100
+    component.rect.h = TASK_BOX_HEIGHT
+    component.cached = True  # drawn as one copy until hovered or changed
 
     toggle_button = b.ToggleButton()
     toggle_button.set_relative(component)
@@ -506,43 +398,71 @@ def template_task_box(parent, task):
     toggle_button.set_height(25)
     toggle_button.set_round_edges(0.9)
     toggle_button.on_release = select_task
-    toggle_button.data["task"] = task
+    component.data["toggle"] = toggle_button
 
     title = pgp.Label(task.title)
     title.set_size(25)
     title.set_relative(component)
     title.layout.margin_top = 5
     title.layout.align_left = 0
+    component.data["title"] = title
 
     description = pgp.Label(task.description)
     description.set_relative(component)
     description.set_color(c.GREY)
     description.layout.align_left = 0
     description.layout.align_top = 1
+    component.data["description"] = description
 
     date = pgp.Label(task.date)
     date.set_relative(component)
     date.layout.align_left = 0
     date.layout.margin_bottom = 5
     date.layout.gravity = "bottom"
+    component.data["date"] = date
 
     priority_icon = pgp.Drawable((80, 80))
     priority_icon.set_relative(component)
-    p_icon = label.Label(str(task.priority))
-    p_icon.set_size(int(15+task.priority*2.3))
+    draw_priority_icon(priority_icon.surface, task.priority)
+    priority_icon.layout.gravity = "right centery"
+    priority_icon.layout.margin_right = 20
+    component.data["priority_icon"] = priority_icon
+    component.data["priority"] = task.priority
+
+    bind_task_box(component, task)
+    return component
+
+
+# changes a component made by template_task_box to display another task
+# text and the priority icon are only rendered again if they have changed
+def bind_task_box(component, task):
+    toggle_button = component.data["toggle"]
+    toggle_button.data["task"] = task
+    toggle_button.toggled = task in selected_tasks  # may have been selected before its row left the screen
+    toggle_button.is_clicked = False
+    toggle_button.reset_color()
+    for key, text in [("title", task.title), ("description", task.description), ("date", task.date)]:
+        if component.data[key].text != text:
+            component.data[key].set_text(text)
+    if component.data["priority"] != task.priority:
+        draw_priority_icon(component.data["priority_icon"].surface, task.priority)
+        component.data["priority"] = task.priority
+
+
+# draws the priority of a task as a number in a circle coloured by how high it is
+def draw_priority_icon(surface, priority):
+    surface.fill((0, 0, 0, 0))
+    p_icon = label.Label(str(priority))
+    p_icon.set_size(int(15+priority*2.3))
     p_icon.center((40, 40))
-    p_icon.draw(priority_icon.surface)
-    if task.priority > 8:
+    p_icon.draw(surface)
+    if priority > 8:
         color = c.RED
-    elif task.priority > 4:
+    elif priority > 4:
         color = c.YELLOW
     else:
         color = c.GREEN
-    pygame.draw.circle(priority_icon.surface, color, (40, 40), 38, 4)
-    priority_icon.layout.gravity = "right centery"
-    priority_icon.layout.margin_right = 20
-
-    return component
+    pygame.draw.circle(surface, color, (40, 40), 38, 4)
 
 
 # clears all buttons from page component for displaying a new window
@@ -567,7 +487,6 @@ def empty_page_component():
         page_component.scrollable = True
         back_button.on_release = on_back_pressed
         load_folder_page(current_folder)
-        save_work()
 
     back_button.on_release = end_session
 
@@ -581,6 +500,12 @@ def open_calendar(but=None):
         month = dt.month
     start_day, total_days = monthrange(year, month)
     start_day = (start_day + 1) % 7
+    month_start = datetime.date(year, month, 1).toordinal()
+    if USE_DATABASE:  # found with the database's due day index, without reading in every folder
+        month_tasks = storage.tasks_due_between(main_folder, month_start, month_start + total_days - 1)
+    else:
+        td.load_all_contents(main_folder, storage.load_contents)  # calendar needs every task
+        month_tasks = td.due_dates.by_day(month_start, month_start + total_days - 1)
     settings_button.open = True
     settings_button.on_release_default()
 
@@ -661,29 +586,18 @@ def open_calendar(but=None):
         row_component.layout.w = frame.MATCH
         for col in range(7):  # columns of calendar
             day = col + 7 * row - start_day + 1
-            if month < 10:
-                month_str = "0" + str(month)
-            else:
-                month_str = str(month)
-            if day < 10:
-                day_str = "0" + str(day)
-            else:
-                day_str = str(day)
-            date_str = day_str + "/" + month_str + "/" + str(year)
-            if date_str in all_task_date_dict:
-                tasks = [task.title for task in all_task_date_dict[date_str]]
-            else:
-                tasks = []
+            day_tasks = month_tasks.get(month_start + day - 1, [])
+            tasks = [task.title for task in day_tasks]
             day_button = b.DropDownButton(tasks)
 
             if tasks:
                 for i in range(len(day_button.drop_buttons)):
-                    task = all_task_date_dict[date_str][i]
+                    task = day_tasks[i]
                     day_button.drop_buttons[i].data["task"] = task
                     day_button.drop_buttons[i].on_release = lambda but: load_folder_page(but.data["task"].parent)
 
             def change_draw_priority(self):
-                self.draw_top = self.open
+                self.set_layer(frame.MENU_LAYER if self.open else frame.BASE_LAYER)
             day_button.on_release = change_draw_priority
             day_button.set_relative(row_component)
             if col == 0:
@@ -719,6 +633,96 @@ def open_calendar(but=None):
                 day_button.set_text(str(day))
 
 
+# opens search page, for finding tasks by the words in their title or description
+def open_search(but=None):
+    settings_button.open = True
+    settings_button.on_release_default()
+    td.load_all_contents(main_folder, storage.load_contents)  # search needs every task
+
+    empty_page_component()
+    page_component.scrollable = True
+    tool_bar_title.set_text("Search")
+
+    search_input = pgp.Input((300, 70), "Search:")
+    search_input.set_relative(page_component)
+    search_input.layout.gravity = "top left"
+    search_input.layout.margin_left = 20
+    search_input.layout.margin_top = 20
+    search_input.fill_color = COLOR.light2
+    search_input.border_color = COLOR.dark2
+    search_input.border = 1
+
+    search_button = b.Button()
+    search_button.set_relative(page_component)
+    search_button.set_text("SEARCH")
+    search_button.rect.w = 150
+    search_button.rect.h = 70
+    search_button.layout.gravity = "top"
+    search_button.layout.align_left = 0
+    search_button.layout.margin_left = 20
+    search_button.layout.margin_top = 20
+    search_button.set_default_fill_color(COLOR.light2)
+    search_button.set_hover_color(COLOR.dark1)
+    search_button.set_hold_color(COLOR.dark2)
+    search_button.set_border_color(COLOR.dark2)
+
+    results_component = frame.Component(page_component, frame.RELATIVE, COLOR.light1)
+    results_component.layout.w = frame.MATCH
+    results_component.layout.gravity = "left"
+    results_component.layout.align_top = 0
+    results_component.layout.margin_top = 20
+
+    # shows the tasks matching the search, soonest due first
+    def show_results(but):
+        results_component.clear()
+        results = td.search_index.search(search_input.get_text(), SEARCH_RESULTS)
+        for i, task in enumerate(results):
+            box = template_search_result(results_component, task)
+            box.layout.margin_bottom = 5
+            if i > 0:
+                box.layout.align_top = i - 1
+        results_component.rect.h = len(results) * 75
+
+    search_button.on_release = show_results
+
+
+# returns a component for displaying a search result, which opens the task's folder when clicked
+def template_search_result(parent, task):
+    component = frame.Component(parent, frame.RELATIVE, COLOR.light2)
+    component.layout.w = frame.MATCH
+    component.rect.h = 70
+
+    full_button = b.Button()
+    full_button.set_relative(component)
+    full_button.layout.w = frame.MATCH
+    full_button.layout.h = frame.MATCH
+    full_button.set_default_fill_color(COLOR.light2)
+    full_button.set_hover_color(COLOR.dark1)
+    full_button.set_hold_color(COLOR.dark2)
+    full_button.set_border(0)
+    full_button.on_release = load_folder_page_on_click
+    full_button.data["parent_folder"] = task.parent
+
+    title = pgp.Label(task.title)
+    title.set_relative(component)
+    title.set_size(25)
+    title.layout.margin_top = 5
+    title.layout.margin_left = 20
+
+    folders = []
+    folder = task.parent
+    while folder.parent is not None:
+        folders.insert(0, folder.title)
+        folder = folder.parent
+    location = pgp.Label(" > ".join(folders + [task.date]))
+    location.set_relative(component)
+    location.set_color(c.GREY)
+    location.layout.align_top = 1
+    location.layout.margin_left = 20
+
+    return component
+
+
 # opens settings page
 def open_settings(but):
     empty_page_component()
@@ -838,6 +842,36 @@ def open_settings(but):
     hours_spend_data.layout.align_left = 0
     # hours_spend_data.on_release = lambda but: User.DisplayStudyHours()
 
+    summary = pgp.Label(task_summary())
+    summary.set_relative(page_component)
+    summary.layout.align_top = 3
+    summary.layout.gravity = "top left"
+    summary.layout.margin_top = 30
+    summary.layout.margin_left = 20
+
+
+# returns text counting the overdue tasks, the tasks due this week and the tasks completed since opening
+# only counts the tasks already read in, so folders that have not been opened are not read in for it
+def task_summary():
+    today = datetime.date.today().toordinal()
+    folder_counts = dict()
+    if td.table is None:
+        summary = (str(len(td.due_dates.overdue(today))) + " overdue, " +
+                   str(len(td.due_dates.upcoming(today))) + " due this week")
+    else:
+        overdue = td.table.overdue(today)
+        summary = (str(int(overdue.sum())) + " overdue, " + str(int(td.table.due_between(today, today + 6).sum())) +
+                   " due this week")
+        folder_counts = td.table.count_by_folder(overdue)
+        folder_counts.pop(main_folder, None)
+    if not td.all_loaded(main_folder):
+        summary += " in opened folders"
+    summary += ", " + str(tasks_completed) + " completed"
+    if folder_counts:
+        folder = max(folder_counts, key=folder_counts.get)
+        summary += " (most overdue: " + folder.title + ")"
+    return summary
+
 
 # starts studying session from selected tasks
 def start_session(b):
@@ -865,7 +899,7 @@ def start_session(b):
         User.Add_Tasks(User.tasks_being_completed)
         User.tasks_being_completed = 0
         User.Add_Time((time.time() - start_time)//60)
-        save_work()
+        storage.save_user_data(User)
 
     back_button.on_release = end_session
     tool_bar_title.set_text("Study Session")
@@ -873,7 +907,7 @@ def start_session(b):
     timer_component = frame.Component(page_component, frame.RELATIVE, COLOR.light1)
     timer_component.layout.w = frame.MATCH
     timer_component.rect.h = 350
-    timer_component.draw_top = True
+    timer_component.set_layer(frame.OVERLAY_LAYER)
     active_timer = timer.DynamicTimer([25*60, 5*60])
     active_timer.set_relative(timer_component)
     active_timer.layout.gravity = "centerx centery"
@@ -922,10 +956,10 @@ def create_task_component_for_session():
         toggle_button.set_height(50)
         toggle_button.layout.gravity = "centery"
         toggle_button.layout.margin_left = 30
-        toggle_button.data["task"] = task.data["task"]
+        toggle_button.data["task"] = task
         toggle_button.on_release = complete_task
 
-        title = pgp.Label(task.data["task"].title)
+        title = pgp.Label(task.title)
         title.set_relative(task_component)
         title.set_size(50)
         title.layout.gravity = "centery"
@@ -936,28 +970,29 @@ def create_task_component_for_session():
 
 # when task in studying is toggled, it is deleted
 def complete_task(but):
-    global current_folder
+    global current_folder, tasks_completed
     if but.toggled:
-        current_folder.contents.remove(but.data["task"])
-        all_task_date_dict[but.data["task"].date].remove(but.data["task"])
+        log_change(journal.remove_record(but.data["task"]))
+        current_folder.remove(but.data["task"])
+        td.unregister_task(but.data["task"])
         User.tasks_being_completed += 1
+        tasks_completed += 1
     else:
-        current_folder.contents.append(but.data["task"])
-        if but.data["task"].date in all_task_date_dict:
-            all_task_date_dict[but.data["task"].date].append(but.data["task"])
-        else:
-            all_task_date_dict[but.data["task"].date] = [but.data["task"]]
+        current_folder.add(but.data["task"])
+        td.register_task(but.data["task"])
+        log_change(journal.add_record(but.data["task"]))
         User.tasks_being_completed -= 1
+        tasks_completed -= 1
 
 
 # when task on main screen is toggled, it is appended or removed from selected tasks
-# start studying becomes visible if at least one button is selected
+# start studying becomes visible if at least one task is selected
 def select_task(but):
     global selected_tasks
     if but.toggled:
-        selected_tasks.append(but)
+        selected_tasks.append(but.data["task"])
     else:
-        selected_tasks.remove(but)
+        selected_tasks.remove(but.data["task"])
     start_task_button.set_visibility(bool(selected_tasks))
     start_task_button.set_active(bool(selected_tasks))
 
@@ -966,40 +1001,9 @@ def select_task(but):
 def delete_current_folder(but):
     settings_button.on_release_default()
     if current_folder.parent is not None and not current_folder.contents:
-        current_folder.parent.contents.remove(current_folder)
+        log_change(journal.remove_record(current_folder))
+        current_folder.parent.remove(current_folder)
         load_folder_page(current_folder.parent)
-        save_work()
-
-
-# recursive algorithm creating folders from text file
-# creates directory as a tree data structure
-def createfolder(parentfolder):
-    global fi
-    next_line = fi.readline().strip()
-    while next_line != "}" and next_line != '':
-        if next_line[-1] == "{":
-            new_folder = Folder(next_line[:-1], parentfolder)
-            createfolder(new_folder)
-            parentfolder.add(new_folder)
-        else:
-            parentfolder.taskadd(next_line, parentfolder)
-        next_line = fi.readline().strip()
-    return
-
-
-# saves all tasks, folders, and their paths in the respective text files
-def save_contents(item, taskfold, foldfold):
-    if type(item) == Folder:
-        if item != main_folder:
-            foldfold.write(item.title + "{\n")
-        for thing in item.contents:
-            save_contents(thing, taskfold, foldfold)
-        if item != main_folder:
-            foldfold.write("}\n")
-    elif type(item) == Task:
-        foldfold.write(item.taskcode + '\n')
-        for attribute in item.data:
-            taskfold.write(str(attribute) + "\n")
 
 
 # sets sorting to by date
@@ -1008,57 +1012,41 @@ def sort_by_date_on_click(b):
     load_folder_page(current_folder)
 
 
-# sorts list of tasks and folders by date, placing folders at the beginning
-def sortbydate(tasklist):
-    folderlist = []
-    for item in tasklist:  # Removes all folders with no due date
-        if type(item) is Folder:
-            folderlist.append(item)
-        else:
-            item.date = item.date.split("/")
-    for f in folderlist:
-        tasklist.remove(f)
-    tasklist = sorted(tasklist, key=lambda task: int(task.date[0]))
-    tasklist = sorted(tasklist, key=lambda task: int(task.date[1]))
-    tasklist = sorted(tasklist, key=lambda task: int(task.date[2]))
-    for item in tasklist:
-        item.date = "/".join(item.date)
-    return folderlist + tasklist
-
-
 # sets sorting to by priority
 def sort_by_priority_on_click(b):
     b.data["main"].set_text(b.text)
     load_folder_page(current_folder)
 
 
-# sorts list of tasks and folders by priority, placing folders at the beginning
-def sortbypriority(tasklist):
-    folderlist = []
-    for item in tasklist:  # Removes all folders with no priority
-        if type(item) is Folder:
-            folderlist.append(item)
-    for f in folderlist:
-        tasklist.remove(f)
-    tasklist = sorted(tasklist, key=lambda task: int(task.priority), reverse=True)
-    return folderlist + tasklist
-
-
 # saves all tasks, folders, and their directories, as well as all user data
+# compacts the change journal, as all of its changes are now in the save files
 def save_work():
-    fi = open('folder folder.txt', 'w')
-    fo = open('Saved Tasks.txt', 'w')
-    save_contents(main_folder, fo, fi)
-    User.SaveData()
-    fi.close()
-    fo.close()
+    storage.compact(main_folder)
+    storage.save_user_data(User)
+
+
+# saves a change to the folders or tasks, compacting the journal when it gets too long
+def log_change(record):
+    storage.append(record)
+    if storage.needs_compaction():
+        save_work()
 
 
-# redraws everything in the main_component (main component contains all other drawables on screen)
+# redraws the parts of the window that have changed (main component contains all other drawables on screen)
+# everything is drawn again, but only the changed area of the window is drawn on and updated
 def redraw():
-    win.fill(c.WHITE)
-    main_component.draw(win)
-    pygame.display.update()
+    frame.move_scrolled_areas(win)
+    rects = frame.take_dirty_rects()
+    if rects is None:
+        win.fill(c.WHITE)
+        main_component.draw(win)
+        pygame.display.update()
+    elif rects:
+        win.set_clip(rects[0].unionall(rects[1:]))
+        win.fill(c.WHITE)
+        main_component.draw(win)
+        win.set_clip(None)
+        pygame.display.update(rects)
 
 
 # --------------------Constants--------------------
@@ -1069,6 +1057,13 @@ MONTH = dt.month
 DAY = dt.day
 MIN_WIDTH = 600
 MIN_HEIGHT = 400
+IDLE_WAIT = 500  # most milliseconds to wait for an event when nothing is changing
+USE_DATABASE = False  # store folders, tasks and user data in an sqlite database instead of the text files
+LAZY_LOADING = False  # only read in a folder's tasks when the folder is first opened
+FOLDER_BOX_HEIGHT = 70
+TASK_BOX_HEIGHT = 100
+SEARCH_RESULTS = 50  # most search results shown at once
+TASK_TABLE = True  # keep a numpy table of every task for the analytics (if numpy is installed)
 COLOR = Palette()
 MONTH_NAMES = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"]
 
@@ -1078,7 +1073,7 @@ MONTH_NAMES = ["January", "February", "March", "April", "May", "June", "July", "
 pygame.init()
 
 win = pygame.display.set_mode((700, 600), pygame.RESIZABLE)
-pygame.display.set_icon(pygame.image.load("brainicon.png"))
+pygame.display.set_icon(assets.image("brainicon.png"))
 pygame.display.set_caption("Big Brain Time")
 
 main_component = frame.Component(win, background_color=COLOR.light1)
@@ -1086,20 +1081,23 @@ main_component = frame.Component(win, background_color=COLOR.light1)
 # initialises variables
 year = dt.year
 month = dt.month
-all_task_codes = []
 selected_tasks = []
-all_task_date_dict = dict()
+tasks_completed = 0  # tasks completed in study sessions since opening (see complete_task)
+
+# storage engine for saving changes, written to from a background thread
+if USE_DATABASE:
+    storage = autosave.AutoSaver(database.TaskDatabase())
+else:
+    storage = autosave.AutoSaver(journal.Journal())
 
 # reads in user data
-User = UserData()
-User.ReadInData()
+User = td.UserData()
+storage.read_user_data(User)
 
 # reads in folders and tasks
-fi = open('folder folder.txt', 'r')
-fo = open('Saved Tasks.txt', 'r')
-fol = fo.read().splitlines()
-main_folder = Folder("Big Brain Time")
-createfolder(main_folder)
+if TASK_TABLE:
+    td.create_task_table()
+main_folder = storage.load_folders("Big Brain Time", LAZY_LOADING)
 current_folder = main_folder
 
 # ----------------------------
@@ -1109,7 +1107,7 @@ current_folder = main_folder
 tool_bar = frame.Component(main_component, frame.RELATIVE, COLOR.dark2)
 tool_bar.layout.w = frame.MATCH
 tool_bar.rect.h = 70
-tool_bar.draw_top = True
+tool_bar.set_layer(frame.OVERLAY_LAYER)
 
 back_button = b.Button()
 back_button.set_relative(tool_bar)
@@ -1122,10 +1120,9 @@ back_button.set_border_color(COLOR.dark2)
 back_button.border = 0
 back_button.on_release = on_back_pressed
 
-back_icon = pgp.Drawable((70, 70))
+back_icon = pgp.Drawable(assets.image("backbutton-2.png"))
 back_icon.set_relative(tool_bar)
 back_icon.layout.gravity = "top left"
-back_icon.surface.blit(pygame.image.load("backbutton-2.png"), (0, 0))
 
 tool_bar_title = pgp.Label(current_folder.title)
 tool_bar_title.set_relative(tool_bar)
@@ -1138,7 +1135,7 @@ side_bar = frame.Component(main_component, frame.RELATIVE, COLOR.dark1)
 side_bar.rect.w = 70
 side_bar.layout.h = frame.MATCH
 
-settings_button = b.DropDownButton(["SETTINGS", "DELETE FOLDER", "CALENDAR"])
+settings_button = b.DropDownButton(["SETTINGS", "DELETE FOLDER", "CALENDAR", "SEARCH"])
 settings_button.set_relative(side_bar)
 settings_button.layout.w = frame.MATCH
 settings_button.rect.h = 70
@@ -1146,7 +1143,7 @@ settings_button.spacing = 20
 settings_button.layout.gravity = "bottom centerx"
 settings_button.drop_buttons_width = 200
 settings_button.menu_direction = b.UP
-settings_button.draw_top = True
+settings_button.set_layer(frame.MENU_LAYER)
 settings_button.set_round_edges(0.3)
 settings_button.set_default_fill_color(COLOR.dark2)
 settings_button.set_hover_color(COLOR.dark1)
@@ -1155,12 +1152,14 @@ settings_button.set_border_color(COLOR.dark2)
 settings_button.drop_buttons[0].on_release = open_settings
 settings_button.drop_buttons[1].on_release = delete_current_folder
 settings_button.drop_buttons[2].on_release = open_calendar
+settings_button.drop_buttons[3].on_release = open_search
 
-gear_icon = pgp.Drawable((70, 70))
+gear_icon = pgp.Drawable(assets.image("gearicon.png"))
 gear_icon.set_relative(side_bar)
 gear_icon.layout.gravity = "bottom left"
-gear_icon.surface.blit(pygame.image.load("gearicon.png"), (6, 8))
-gear_icon.draw_top = True
+gear_icon.layout.margin_left = 3  # margins are added twice with "left" gravity, so drawn 6 from the left
+gear_icon.layout.margin_bottom = 6
+gear_icon.set_layer(frame.MENU_LAYER)  # drawn over the settings button
 
 page_component = frame.Component(main_component, frame.RELATIVE, COLOR.light1)
 page_component.scrollable = True
@@ -1221,6 +1220,9 @@ add_button.set_hover_color(COLOR.dark1)
 add_button.set_hold_color(COLOR.light1)
 add_button.set_border_color(c.BLACK)
 
+# folder page rows that are not on screen, kept to be shown again for other folders and tasks
+row_pool = frame.RowPool(template_box, bind_box)
+
 # loads main page (main folder)
 load_folder_page(current_folder)
 
@@ -1231,15 +1233,27 @@ clock = pygame.time.Clock()
 # --------------------Main Loop--------------------
 
 while program_run:
-    dt = clock.tick(120)/1000
+    frame.layout_passes = 0  # counts the rects worked out this frame
     redraw()
 
+    # runs at full frame rate while something is changing by itself (such as a timer), otherwise waits for events
+    if frame.animating:
+        clock.tick(120)
+        events = pygame.event.get()
+    else:
+        event = pygame.event.wait(IDLE_WAIT)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        events += pygame.event.get()
+    frame.animating = False
+
     # variables for button processing
     click_bool = False
     release_bool = False
-    events = pygame.event.get()
 
     for event in events:
+        # the window has to be drawn again when it changes size or is uncovered
+        if event.type in (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            frame.mark_all_dirty()
         if event.type == pygame.QUIT:
             program_run = False
         elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -1252,8 +1266,25 @@ while program_run:
             WIN = pygame.display.set_mode((max(event.w, MIN_WIDTH), max(event.h, MIN_HEIGHT)), pygame.RESIZABLE)
             main_component.update_screen(WIN)
 
-    # processes clicks and keypresses
+    # processes clicks and keypresses (widgets mark what they change)
+    layout_version = frame.layout_version
     main_component.process(click_bool, release_bool, pygame.mouse.get_pos(), None)
     main_component.process_focus(events, pygame.key.get_pressed())
 
-pygame.quit()
+    # clicks and keypresses that add, remove or move drawables (such as opening a page) can change anything
+    key_pressed = any(event.type == pygame.KEYDOWN for event in events)
+    if (click_bool or release_bool or key_pressed) and frame.layout_version != layout_version:
+        frame.mark_all_dirty()
+
+    # changes that failed to be saved are saved again in the background, so the error is only reported
+    save_error = storage.take_error()
+    if save_error is not None:
+        print("Could not save changes, trying again:", save_error)
+
+# write any changes still waiting to be saved before quitting (the window is closed even if they cannot be saved)
+try:
+    if storage.length:
+        save_work()
+    storage.close()
+finally:
+    pygame.quit()
@@ -4,6 +4,8 @@ import label
 import frame
 import time
 
+GAP_SIZE = 64  # smallest free space a GapBuffer grows by
+
 
 # Loading screen
 class LoadingScreen:
@@ -54,7 +56,7 @@ class Drawable(frame.Drawable):
     def __init__(self, dimensions_or_surface=(10, 10)):
         super().__init__()
         if type(dimensions_or_surface) is pygame.Surface:
-            self.surface = surface
+            self.surface = dimensions_or_surface
             self.rect.w, self.rect.h = dimensions_or_surface.get_width(), dimensions_or_surface.get_height()
         else:
             self.surface = pygame.Surface(dimensions_or_surface, pygame.SRCALPHA)
@@ -75,6 +77,8 @@ class Drawable(frame.Drawable):
         return self.surface.get_height()
 
     def set_visibility(self, b):
+        if b != self.visible:
+            self.mark_changed()
         self.visible = b
 
 
@@ -88,17 +92,23 @@ class Label(frame.Drawable):
         self.rendered_text = None
         self.render_text()
 
+    # changes to the text mark where it was and where it is drawn to be drawn again
     def set_size(self, size):
+        self.mark_changed()
         self.text_size = size
         self.render_text()
+        self.mark_changed()
 
     def set_text(self, text):
+        self.mark_changed()
         self.text = text
         self.render_text()
+        self.mark_changed()
 
     def set_color(self, color):
         self.text_color = color
         self.render_text()
+        self.mark_changed()
 
     def draw(self, win):
         if self.layout_type == frame.RELATIVE:
@@ -110,41 +120,195 @@ class Label(frame.Drawable):
     # renders text drawable
     def render_text(self):
         self.rendered_text = label.Label("".join(self.text), color=self.text_color, size=self.text_size)
-        self.rect.w = self.rendered_text.get_width()
-        self.rect.h = self.rendered_text.get_height()
+        if (self.rect.w, self.rect.h) != (self.rendered_text.get_width(), self.rendered_text.get_height()):
+            self.rect.w = self.rendered_text.get_width()
+            self.rect.h = self.rendered_text.get_height()
+            frame.invalidate_layout()  # drawables next to the label may move
 
 
 class DynamicLabel(Label):
     def __init__(self, function):
         super().__init__()
         self.text_func = function
+        self.processes_everywhere = True  # the text can change at any time
+
+    # marks the label to be drawn again when its text changes
+    def process(self, click_bool, release_bool, mouse_pos, used_process):
+        frame.keep_animating()
+        text = self.text_func(self)
+        if text != self.text:
+            self.set_text(text)
+            frame.mark_dirty(self.get_rect())
+        return used_process
 
     def draw(self, win):
         self.set_text(self.text_func(self))
         super().draw(win)
 
 
+# list for text being typed
+class GapBuffer:
+    """list with a gap of free space at the last place it was changed
+    typing and deleting near the same place only moves the items between the old and new places, not the whole list"""
+    def __init__(self):
+        self.items = [None] * GAP_SIZE
+        self.gap_start = 0
+        self.gap_end = GAP_SIZE
+
+    def __len__(self):
+        return len(self.items) - self.gap_end + self.gap_start
+
+    def __iter__(self):
+        return iter(self.items[:self.gap_start] + self.items[self.gap_end:])
+
+    # returns a list of the items from start to end (exclusive)
+    def slice(self, start, end):
+        gap = self.gap_end - self.gap_start
+        if end <= self.gap_start:
+            return self.items[start:end]
+        elif start >= self.gap_start:
+            return self.items[start + gap:end + gap]
+        return self.items[start:self.gap_start] + self.items[self.gap_end:end + gap]
+
+    # moves the gap to start at an index, moving the items in between to the other side of it
+    def move_gap(self, index):
+        if index < self.gap_start:
+            moved = self.gap_start - index
+            self.items[self.gap_end - moved:self.gap_end] = self.items[index:self.gap_start]
+            self.gap_start -= moved
+            self.gap_end -= moved
+        elif index > self.gap_start:
+            moved = index - self.gap_start
+            self.items[self.gap_start:index] = self.items[self.gap_end:self.gap_end + moved]
+            self.gap_start += moved
+            self.gap_end += moved
+
+    # makes the gap bigger once it is full, doubling the size of the list
+    def grow(self):
+        grow = max(len(self.items), GAP_SIZE)
+        self.items[self.gap_start:self.gap_start] = [None] * grow
+        self.gap_end += grow
+
+    def insert(self, index, item):
+        if self.gap_start == self.gap_end:
+            self.grow()
+        self.move_gap(index)
+        self.items[self.gap_start] = item
+        self.gap_start += 1
+
+    # deletes the items from start to end (exclusive)
+    def delete(self, start, end):
+        self.move_gap(start)
+        self.gap_end += end - start
+
+
+# gap buffer of numbers that can be added up
+class WidthBuffer(GapBuffer):
+    """gap buffer of widths that also keeps a Fenwick tree of them, over the places in the list with the gap as 0
+    widths are added up to an index, and the index a total is reached at is found, without going through the list
+    only the widths that move across the gap change the tree (and the whole tree is made again when the list grows)"""
+    def __init__(self):
+        super().__init__()
+        self.tree = []  # Fenwick tree over the places in items (the node for place p is at p + 1)
+        self.make_tree()
+
+    def make_tree(self):
+        self.tree = [0] + self.items[:self.gap_start] + [0] * (self.gap_end - self.gap_start) + self.items[self.gap_end:]
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+    # adds to the width at a place in items (the gap included)
+    def add(self, place, change):
+        place += 1
+        while place < len(self.tree):
+            self.tree[place] += change
+            place += place & -place
+
+    def move_gap(self, index):
+        moving_left = index < self.gap_start
+        if moving_left:
+            old_places = range(index, self.gap_start)
+        else:
+            old_places = range(self.gap_end, self.gap_end + index - self.gap_start)
+        for place in old_places:
+            self.add(place, -self.items[place])
+        super().move_gap(index)
+        if moving_left:  # the widths moved to after the gap
+            new_places = range(self.gap_end, self.gap_end + len(old_places))
+        else:
+            new_places = range(self.gap_start - len(old_places), self.gap_start)
+        for place in new_places:
+            self.add(place, self.items[place])
+
+    def grow(self):
+        super().grow()
+        self.make_tree()
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self.add(self.gap_start - 1, item)
+
+    def delete(self, start, end):
+        self.move_gap(start)
+        for place in range(self.gap_end, self.gap_end + end - start):
+            self.add(place, -self.items[place])
+        self.gap_end += end - start
+
+    # returns the sum of the widths before an index
+    def sum_to(self, index):
+        if index > self.gap_start:
+            index += self.gap_end - self.gap_start
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+    # returns the number of widths from the start that add up to at most a total (less than it if below)
+    def count_to(self, total, below=False):
+        place = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            if place + step < len(self.tree):
+                width = self.tree[place + step]
+                if width < total or (width == total and not below):
+                    place += step
+                    total -= width
+            step //= 2
+        if place <= self.gap_start:
+            return place
+        return max(place - self.gap_end + self.gap_start, self.gap_start)
+
+
 class Input(frame.Drawable):
-    """input box"""
+    """input box
+    the text and the widths of its letters are kept in gap buffers (the widths with a Fenwick tree, see WidthBuffer),
+    and the box is drawn on its surface again only when what it shows has changed (see get_state)"""
     def __init__(self, wh=(200, 70), title=""):
         super().__init__()
         self.rect.w, self.rect.h = wh
-        self.text = []
-        self.letter_lengths = []
+        self.text = GapBuffer()
+        self.letter_lengths = WidthBuffer()
         self.text_size = 18
+        self.text_font = "lucida bright"
         self.text_color = c.BLACK
         self.title_color = c.GREY
         self.fill_color = c.WHITE
         self.border_color = c.BLACK
         self.border = 2
+        self.text_relative_x = 0
         self.rendered_text = None
+        self.rendered_letters = (0, 0)  # indexes of the first letter rendered and the letter after the last
+        self.rendered_start_x = 0  # x of the first rendered letter from the start of the text
+        self.rendered_view = None  # text_relative_x and width of the box the text was rendered for
         self.render_text()
         self.title = title
         self.rendered_title = None
         self.render_title()
         self.surface = pygame.Surface(wh, pygame.SRCALPHA)
         self.surface.convert_alpha()
-        self.text_relative_x = 0
         self.flashing_line_ind = -1
         self.flashing_time = time.time()
         self.focus = False
@@ -157,32 +321,31 @@ class Input(frame.Drawable):
         self.end_highlight = None
         self.highlight_color = c.SKY_BLUE
         self.clicked = False
+        self.processes_everywhere = True  # clicks anywhere take away focus
+        self.drawn_state = None  # what the box showed when it was last drawn on its surface (see get_state)
         self.valid_chars = """qwertyuiopasdfghjklzxcvbnm1234567890!@#$%^&*()-_=+[{]}\\|;:'",<.>/?`~ """
 
-    # renders text drawable
+    # renders the letters of the text that can be seen in the box
     def render_text(self):
-        self.rendered_text = label.Label("".join(self.text), color=self.text_color, size=self.text_size)
+        first = self.letter_lengths.count_to(-self.text_relative_x)
+        last = min(self.letter_lengths.count_to(self.get_w() - self.text_relative_x, below=True) + 1,
+                   len(self.letter_lengths))
+        self.rendered_letters = (first, last)
+        self.rendered_start_x = self.letter_lengths.sum_to(first)
+        self.rendered_view = (self.text_relative_x, self.get_w())
+        self.rendered_text = label.Label("".join(self.text.slice(first, last)), font=self.text_font,
+                                         color=self.text_color, size=self.text_size)
 
     # renders title drawable
     def render_title(self):
         self.rendered_title = label.Label(self.title, color=self.title_color, size=self.text_size)
 
+    # returns the index of the letter before a click (a letter is passed once the click is 5 pixels from its end)
     def get_at_click(self, mouse_pos):
         relative_click = mouse_pos[0] - self.get_x() - self.text_relative_x
-        ind = None
-        distance = 0
-        i = 0  # if loop does not run
-        for i, letter in enumerate(self.letter_lengths + [-1]):
-            distance += letter
-            if letter == -1:
-                ind = len(self.letter_lengths) - 1
-            elif relative_click < distance - 5:
-                ind = i - 1
-                break
-        if ind is None:
-            ind = i - 1
-        return ind
+        return self.letter_lengths.count_to(relative_click + 5) - 1
 
+    # marks the box to be drawn again when what it shows has changed
     def process(self, click_bool, release_bool, mouse_pos, used_process):
         if click_bool and not self.collide(mouse_pos):
             self.focus = False
@@ -201,6 +364,10 @@ class Input(frame.Drawable):
             if self.collide(mouse_pos) and not used_process:
                 self.focus = True
                 self.flashing_line_ind = self.get_at_click(mouse_pos)
+        if self.focus:  # flashing line and held down keys change the input box without any events
+            frame.keep_animating()
+        if self.get_state() != self.drawn_state:
+            self.mark_changed()
 
     def collide(self, mouse_pos):
         x, y = mouse_pos
@@ -216,36 +383,70 @@ class Input(frame.Drawable):
     def is_valid_character(self, char):
         return char.lower() in self.valid_chars and char.lower() != ""
 
-    def draw(self, win):
-        self.surface = pygame.Surface((self.get_w(), self.get_h()), pygame.SRCALPHA)
-        self.surface.convert_alpha()
-        if self.layout_type == frame.RELATIVE:
-            self.set_relative_rect()
-        self.surface.fill(self.fill_color)
-
-        focus_pos = sum(self.letter_lengths[:self.flashing_line_ind+1]) + self.text_relative_x
+    # returns what the box shows, which changes with the text, the flashing line and the highlighted text
+    def get_state(self):
+        return (self.focus and self.flash(), self.rendered_text, self.rendered_view, self.rendered_title,
+                self.flashing_line_ind, self.start_highlight, self.end_highlight, self.text_relative_x, self.get_w(),
+                self.get_h(), self.fill_color, self.border_color)
+
+    # returns the x in the box of the end of a letter (the start of the text for -1)
+    # letters that were rendered are measured in the rendered text, as it is slightly wider than its letters added up
+    def get_letter_x(self, ind):
+        first, last = self.rendered_letters
+        x = self.text_relative_x + self.rendered_start_x
+        if ind + 1 <= first:
+            return self.text_relative_x + self.letter_lengths.sum_to(ind + 1)
+        elif ind + 1 >= last:
+            return (x + self.rendered_text.get_width() + self.letter_lengths.sum_to(ind + 1)
+                    - self.letter_lengths.sum_to(last))
+        return x + label.get_font(self.text_font, self.text_size).size("".join(self.text.slice(first, ind + 1)))[0]
+
+    # moves the text so the flashing line is in the box
+    def scroll_to_line(self):
+        focus_pos = self.letter_lengths.sum_to(self.flashing_line_ind + 1) + self.text_relative_x
         if focus_pos > self.get_w() - self.margin:
             self.text_relative_x -= focus_pos - self.get_w() + self.margin
-            focus_pos = self.get_w() - self.margin
         else:
             while focus_pos < self.margin * 2:
                 self.text_relative_x += 20
                 focus_pos += 20
         if self.text_relative_x > self.margin:
-            focus_pos -= self.text_relative_x - self.margin
             self.text_relative_x = self.margin
 
+    def draw(self, win):
+        if self.layout_type == frame.RELATIVE:
+            self.set_relative_rect()
+        self.scroll_to_line()
+        if self.rendered_view != (self.text_relative_x, self.get_w()):
+            self.render_text()
+            overshoot = self.get_letter_x(self.flashing_line_ind) - self.get_w() + self.margin
+            if overshoot > 0:  # the rendered text is wider than the letters added up, so the text is moved a bit more
+                self.text_relative_x -= overshoot
+                self.rendered_view = (self.text_relative_x, self.get_w())
+        state = self.get_state()
+        if state != self.drawn_state:
+            self.drawn_state = state
+            self.draw_surface(state[0])
+        win.blit(self.surface, (self.get_x(), self.get_y()))
+
+    # draws the box on its surface (only made again when the box changes size)
+    def draw_surface(self, flashing):
+        if self.surface.get_size() != (self.get_w(), self.get_h()):
+            self.surface = pygame.Surface((self.get_w(), self.get_h()), pygame.SRCALPHA)
+            self.surface.convert_alpha()
+        self.surface.fill(self.fill_color)
+
         if len(self.text) == 0:
             self.rendered_title.set_x(self.text_relative_x)
             self.rendered_title.set_y((self.get_h() - self.rendered_text.get_height()) / 2)
             self.rendered_title.draw(self.surface)
         else:
-            self.rendered_text.set_x(self.text_relative_x)
+            self.rendered_text.set_x(self.text_relative_x + self.rendered_start_x)
             self.rendered_text.set_y((self.get_h() - self.rendered_text.get_height()) / 2)
 
             if self.end_highlight != self.start_highlight:
-                start_x = sum(self.letter_lengths[:self.start_highlight + 1]) + self.text_relative_x
-                end_x = sum(self.letter_lengths[:self.end_highlight + 1]) + self.text_relative_x
+                start_x = self.get_letter_x(self.start_highlight)
+                end_x = self.get_letter_x(self.end_highlight)
                 pygame.draw.rect(self.surface, self.highlight_color,
                                  (start_x, self.rendered_text.y, end_x - start_x, self.rendered_text.get_height()))
 
@@ -253,12 +454,12 @@ class Input(frame.Drawable):
 
         pygame.draw.rect(self.surface, self.fill_color, (0, 0, self.margin, self.get_h()))
         pygame.draw.rect(self.surface, self.fill_color, (self.get_w() - self.margin, 0, self.margin, self.get_h()))
-        if self.focus and self.flash():
+        if flashing:
+            focus_pos = self.get_letter_x(self.flashing_line_ind)
             pygame.draw.line(self.surface, self.text_color, (focus_pos, (self.get_h() - self.rendered_text.get_height())/2),
                              (focus_pos, (self.get_h() + self.rendered_text.get_height())/2))
         if self.border > 0:
             pygame.draw.rect(self.surface, self.border_color, (0, 0, self.get_w(), self.get_h()), self.border)
-        win.blit(self.surface, (self.get_x(), self.get_y()))
 
     def run_event(self):
         current_time = time.time()
@@ -288,18 +489,10 @@ class Input(frame.Drawable):
             if self.current_character is not None and self.run_event():
                 if self.current_character.key == pygame.K_BACKSPACE:
                     if self.end_highlight is not None and self.end_highlight != self.start_highlight and not self.clicked:
-                        s, e = sorted([self.start_highlight+1, self.end_highlight+1])
-                        del self.text[s:e]
-                        del self.letter_lengths[s:e]
-                        self.start_highlight = None
-                        self.end_highlight = None
-                        self.render_text()
-                        self.flashing_line_ind = s - 1
+                        self.delete_highlight()
                     elif self.flashing_line_ind >= 0:
-                        del self.text[self.flashing_line_ind]
-                        del self.letter_lengths[self.flashing_line_ind]
+                        self.delete(self.flashing_line_ind, self.flashing_line_ind + 1)
                         self.flashing_line_ind -= 1
-                        self.render_text()
                 elif self.current_character.key == pygame.K_LEFT:
                     if self.flashing_line_ind > 0:
                         self.flashing_line_ind -= 1
@@ -308,27 +501,29 @@ class Input(frame.Drawable):
                         self.flashing_line_ind += 1
                 elif self.is_valid_character(self.current_character.unicode):
                     if self.end_highlight is not None and self.end_highlight != self.start_highlight and not self.clicked:
-                        s, e = sorted([self.start_highlight+1, self.end_highlight+1])
-                        del self.text[s:e]
-                        del self.letter_lengths[s:e]
-                        self.start_highlight = None
-                        self.end_highlight = None
-                        self.render_text()
-                        self.flashing_line_ind = s - 1
-
-                        self.text = self.text[:self.flashing_line_ind + 1] + [self.current_character.unicode] + self.text[self.flashing_line_ind + 1:]
-                        last_width = self.rendered_text.get_width()
-                        self.render_text()
-                        self.letter_lengths.insert(self.flashing_line_ind + 1, self.rendered_text.get_width() - last_width)
-
-                        self.flashing_line_ind += 1
-
-                    else:
-                        self.text = self.text[:self.flashing_line_ind+1] + [self.current_character.unicode] + self.text[self.flashing_line_ind+1:]
-                        last_width = self.rendered_text.get_width()
-                        self.render_text()
-                        self.letter_lengths.insert(self.flashing_line_ind+1, self.rendered_text.get_width() - last_width)
-                        self.flashing_line_ind += 1
+                        self.delete_highlight()
+                    self.insert(self.flashing_line_ind + 1, self.current_character.unicode)
+                    self.flashing_line_ind += 1
+
+    # inserts a character into the text at an index, measuring only that character
+    # (the text is rendered again when the box is drawn, once the text has been moved to show the flashing line)
+    def insert(self, index, char):
+        self.text.insert(index, char)
+        self.letter_lengths.insert(index, label.glyph_width(char, self.text_font, self.text_size))
+        self.rendered_view = None
+
+    # deletes the text from start to end (exclusive)
+    def delete(self, start, end):
+        self.text.delete(start, end)
+        self.letter_lengths.delete(start, end)
+        self.rendered_view = None
+
+    def delete_highlight(self):
+        s, e = sorted([self.start_highlight+1, self.end_highlight+1])
+        self.delete(s, e)
+        self.start_highlight = None
+        self.end_highlight = None
+        self.flashing_line_ind = s - 1
 
     def get_text(self):
         return "".join(self.text)
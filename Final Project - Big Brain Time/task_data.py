@@ -0,0 +1,610 @@
+# --------------------------------------------------------------------
+# Program: Task Data Classes
+# Description: Classes for storing tasks, folders and user data, as
+#   well as reading and writing them to the save files.
+# --------------------------------------------------------------------
+
+import datetime
+import os
+import re
+import bisect
+import heapq
+"""matplotlib functionality commented out"""
+# import matplotlib.pyplot as plt
+# plt.style.use('ggplot')
+
+# save files
+FOLDER_FILE = 'folder folder.txt'
+TASK_FILE = 'Saved Tasks.txt'
+USER_FILE = 'UserData.txt'
+# the folder and task files are always read and written as UTF-8 with "\n" line endings (old "\r\n" files are read
+# the same way), so the task file positions kept for lazy loading are right whatever the system's encoding
+SAVE_ENCODING = 'utf-8'
+
+# task codes are task ids written in base 36, which are always shorter than the old 10 character random codes
+CODE_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+OLD_CODE_LENGTH = 10
+NO_DUE_DAY = datetime.date.max.toordinal() + 1  # sorts tasks with a due date that does not exist last
+
+tasks_by_code = dict()  # task code:task for every task read in
+next_task_id = 0
+task_index = dict()  # task code:saved task lines, filled when reading in the task file
+table = None  # task table of every registered task, see create_task_table
+# number of times the save files have been rewritten, saved as the first line of the folder file
+# (the change journal leaves out records from before the save files were last rewritten, see journal.py)
+save_generation = 0
+GENERATION_PREFIX = "#generation "  # longer than any task code, so it is never read as one
+
+
+# class for storing all task data
+class Task:
+    """stores all task data. can generate task codes
+    uses slots, as there can be a very large number of tasks"""
+    __slots__ = ("title", "taskcode", "description", "date", "due_day", "priority", "parent", "row")
+
+    def __init__(self, code, title, description, duedate, priority, parentfolder):
+        self.title = title
+        self.taskcode = code
+        self.description = description
+        self.priority = priority
+        self.parent = parentfolder
+        self.row = None  # row of the task in the task table
+        self.set_date(duedate)
+
+    # sets the "dd/mm/yyyy" due date along with its day number, so it is only read once
+    def set_date(self, duedate):
+        self.date = duedate
+        self.due_day = date_ordinal(duedate)
+
+    # returns the saved task data as (code, title, description, due date, priority)
+    @property
+    def data(self):
+        return self.taskcode, self.title, self.description, self.date, self.priority
+
+    # generating task code for saving the task
+    # ids only ever go up, so the code is never a duplicate
+    @staticmethod
+    def generate_task_code():
+        global next_task_id
+        code = encode_task_id(next_task_id)
+        next_task_id += 1
+        return code
+
+
+# class for keeping tasks in order without sorting them
+class SortedTasks:
+    """list of tasks kept sorted by a key as tasks are added and removed
+    tasks with the same key stay in the order they were added"""
+    def __init__(self, key):
+        self.key = key
+        self.keys = []
+        self.tasks = []
+
+    def add(self, task):
+        key = self.key(task)
+        i = bisect.bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.tasks.insert(i, task)
+
+    def remove(self, task):
+        key = self.key(task)
+        start = bisect.bisect_left(self.keys, key)
+        i = start + self.tasks[start:bisect.bisect_right(self.keys, key)].index(task)
+        del self.keys[i]
+        del self.tasks[i]
+
+
+# class for storing all folder data
+class Folder:
+    """stores all folder data, including contents
+    keeps its tasks sorted by priority and by date as they are added and removed"""
+    def __init__(self, title, parent=None):
+        self.title = title
+        self.contents = []
+        self.parent = parent
+        # where the folder's tasks are saved until they are read in (lazy loading)
+        # for the text save files, a list of positions in the task file that is kept up to date when it is rewritten
+        self.unloaded = None
+        self.folders = []  # sub folders in the order they were added
+        self.by_priority = SortedTasks(lambda task: -task.priority)
+        self.by_date = SortedTasks(due_day_key)
+
+    def add(self, item):
+        self.contents.append(item)
+        if type(item) is Folder:
+            self.folders.append(item)
+        else:
+            self.by_priority.add(item)
+            self.by_date.add(item)
+
+    def remove(self, item):
+        self.contents.remove(item)
+        if type(item) is Folder:
+            self.folders.remove(item)
+        else:
+            self.by_priority.remove(item)
+            self.by_date.remove(item)
+
+    # add a task to the folder when reading in from file
+    def taskadd(self, code, parentfolder):
+        lines = task_index.get(code)
+        if lines is not None:
+            task = Task(lines[0], lines[1], lines[2], lines[3], int(lines[4]), parentfolder)
+            self.add(task)
+            register_task(task)
+
+    # returns the sub folders of the folder (in the order they are saved)
+    def subfolders(self):
+        return self.folders
+
+    # returns the contents of the folder with sub folders first, then tasks by priority (highest first) or by date
+    def sorted_contents(self, by_date=False):
+        if by_date:
+            return self.folders + self.by_date.tasks
+        return self.folders + self.by_priority.tasks
+
+
+# class for storing all user data for analytics
+class UserData:
+    """stores all user data for analytics
+    can display the data using matplotlib module"""
+    def __init__(self):
+        self.studysessions = []
+        self.taskscompleted = []
+        self.tasks_being_completed = 0
+
+    # add time spent doing a task
+    def Add_Time(self, time):
+        newtime = round(int(time) / 60, 1)
+        today = datetime.datetime.now()
+        date = str(today.day) + "/" + str(today.month)
+        for item in self.studysessions:
+            if item[0] == date:
+                item[1] += newtime
+                return
+        if len(self.studysessions) > 7:  # delete data older than 7 days
+            del (self.studysessions[0])
+        self.studysessions.append([date, time])
+
+    # add number of tasks completed
+    def Add_Tasks(self, taskcount):
+        today = datetime.datetime.now()
+        date = str(today.day) + "/" + str(today.month)
+        for item in self.taskscompleted:
+            if item[0] == date:
+                item[1] += taskcount#Adds task to current day count if current day already exists
+                return
+        if len(self.taskscompleted) > 7:  # delete data older than 7 days
+            del (self.taskcompleted[0])
+        self.taskscompleted.append([date, int(taskcount)])
+
+    # display bar graph with time spend studying
+    def DisplayStudyHours(self):
+        x = [pair[0] for pair in self.studysessions]
+        x_pos = [i for i in range(len(self.studysessions))]
+        y_pos = [pair[1] for pair in self.studysessions]
+        plt.bar(x_pos, y_pos, color='pink')
+        plt.xlabel("Date")
+        plt.ylabel("Study Hours")
+        plt.title("Study hours per day")
+        plt.xticks(x_pos, x)
+        plt.show()
+
+    # display bar graph with tasks completed
+    def DisplayTasksCompleted(self):
+        x = [pair[0] for pair in self.taskscompleted]
+        x_pos = [i for i in range(len(self.taskscompleted))]
+        y_pos = [pair[1] for pair in self.taskscompleted]
+        plt.bar(x_pos, y_pos, color='pink')
+        plt.xlabel("Date")
+        plt.ylabel("Tasks Completed")
+        plt.title("Day")
+        plt.xticks(x_pos, x)
+        plt.show()
+
+    # save data to text file
+    def SaveData(self):
+        fi = open(USER_FILE, 'w')
+        for item in self.studysessions:
+            fi.write(item[0] + "," + str(item[1]) + "\n")
+        fi.write("Tasks Completed\n")
+        for item in self.taskscompleted:
+            fi.write(item[0] + "," + str(item[1]) + "\n")
+        fi.close()
+
+    # read data in from text file
+    def ReadInData(self):
+        fi = open(USER_FILE, 'r')
+        alllines = fi.read().splitlines()
+        for i in range(len(alllines)):
+            if alllines[i] != "Tasks Completed":
+                line = alllines[i].split(",")
+                self.studysessions.append([line[0], float(line[1])])
+            else:
+                alllines = alllines[i + 1:]
+                for j in range(len(alllines)):
+                    line = alllines[j].split(",")
+                    self.taskscompleted.append([line[0], float(line[1])])
+                break
+
+
+# class for finding tasks by their due date
+class DateIndex:
+    """sorted index of tasks by due day (see date_ordinal)
+    finds the tasks due on a day or between two days without looking at any other tasks"""
+    def __init__(self):
+        self.days = []  # sorted list of every day that has tasks due
+        self.tasks = dict()  # due day:list of tasks
+
+    def add(self, task):
+        day = task.due_day
+        if day is None:
+            return
+        if day in self.tasks:
+            self.tasks[day].append(task)
+        else:
+            bisect.insort(self.days, day)
+            self.tasks[day] = [task]
+
+    def remove(self, task):
+        day = task.due_day
+        if task in self.tasks.get(day, []):
+            self.tasks[day].remove(task)
+            if not self.tasks[day]:
+                del self.tasks[day]
+                del self.days[bisect.bisect_left(self.days, day)]
+
+    def clear(self):
+        self.days = []
+        self.tasks = dict()
+
+    # returns list of tasks due on a day
+    def on(self, day):
+        return self.tasks.get(day, [])
+
+    # returns dictionary of due day:list of tasks for every day between two days (inclusive) with tasks due
+    def by_day(self, first_day, last_day):
+        start = bisect.bisect_left(self.days, first_day)
+        end = bisect.bisect_right(self.days, last_day)
+        return {day: self.tasks[day] for day in self.days[start:end]}
+
+    # returns list of tasks due between two days (inclusive), soonest first
+    def between(self, first_day, last_day):
+        tasks = []
+        for day_tasks in self.by_day(first_day, last_day).values():
+            tasks += day_tasks
+        return tasks
+
+    # returns list of tasks due before a day
+    def overdue(self, today):
+        return self.between(0, today - 1)
+
+    # returns list of tasks due within a number of days from a day (including that day)
+    def upcoming(self, today, days=7):
+        return self.between(today, today + days - 1)
+
+
+due_dates = DateIndex()
+
+
+# class for finding tasks by the words in their title and description
+class SearchIndex:
+    """inverted index of word:task codes of the tasks with that word in their title or description
+    words are lowercase runs of letters and numbers (see search_words)
+    built from every registered task on the first search, so it does not slow down loading"""
+    def __init__(self):
+        self.codes = dict()  # word:set of task codes
+        self.sorted_words = None  # every word in order, sorted again when next needed after words change
+        self.built = False
+
+    def build(self):
+        self.built = True
+        for task in tasks_by_code.values():
+            self.add(task)
+
+    def add(self, task):
+        if not self.built:
+            return
+        for word in search_words(task.title + " " + task.description):
+            if word in self.codes:
+                self.codes[word].add(task.taskcode)
+            else:
+                self.codes[word] = {task.taskcode}
+                self.sorted_words = None
+
+    def remove(self, task):
+        if not self.built:
+            return
+        for word in search_words(task.title + " " + task.description):
+            codes = self.codes.get(word)
+            if codes is not None:
+                codes.discard(task.taskcode)
+                if not codes:
+                    del self.codes[word]
+                    self.sorted_words = None
+
+    def clear(self):
+        self.codes = dict()
+        self.sorted_words = None
+        self.built = False
+
+    # returns set of codes of tasks with a word starting with prefix
+    def prefix_codes(self, prefix):
+        if self.sorted_words is None:
+            self.sorted_words = sorted(self.codes)
+        codes = set()
+        for i in range(bisect.bisect_left(self.sorted_words, prefix), len(self.sorted_words)):
+            if not self.sorted_words[i].startswith(prefix):
+                break
+            codes |= self.codes[self.sorted_words[i]]
+        return codes
+
+    # returns list of tasks with every word of the query, soonest due first (only the first limit tasks if given)
+    # the last word of the query only has to be the start of a word, so results can be shown while typing
+    def search(self, query, limit=None):
+        if not self.built:
+            self.build()
+        words = search_words(query)
+        if not words:
+            return []
+        matches = [self.codes.get(word, set()) for word in words[:-1]] + [self.prefix_codes(words[-1])]
+        matches.sort(key=len)
+        codes = matches[0].intersection(*matches[1:])
+        tasks = [tasks_by_code[code] for code in codes if code in tasks_by_code]
+        if limit is not None:
+            return heapq.nsmallest(limit, tasks, key=due_day_key)
+        tasks.sort(key=due_day_key)
+        return tasks
+
+
+search_index = SearchIndex()
+
+
+# returns a task id written as a task code
+def encode_task_id(task_id):
+    code = CODE_DIGITS[task_id % 36]
+    while task_id >= 36:
+        task_id //= 36
+        code = CODE_DIGITS[task_id % 36] + code
+    return code
+
+
+# returns the task id of a task code, or None for old random codes
+def decode_task_id(code):
+    if len(code) >= OLD_CODE_LENGTH or not code or code.strip(CODE_DIGITS):
+        return None
+    return int(code, 36)
+
+
+# makes sure generated task codes come after a code that is already in use
+def use_task_code(code):
+    global next_task_id
+    task_id = decode_task_id(code)
+    if task_id is not None and task_id >= next_task_id:
+        next_task_id = task_id + 1
+
+
+# adds a task to the task code dictionary, the due date and search indexes and the task table
+def register_task(task):
+    tasks_by_code[task.taskcode] = task
+    use_task_code(task.taskcode)
+    due_dates.add(task)
+    search_index.add(task)
+    if table is not None:
+        table.add(task)
+
+
+# removes a task from the task code dictionary and the due date and search indexes, marking it removed in the task table
+def unregister_task(task):
+    if tasks_by_code.get(task.taskcode) is task:
+        del tasks_by_code[task.taskcode]
+    due_dates.remove(task)
+    search_index.remove(task)
+    if table is not None:
+        table.remove(task)
+
+
+# starts keeping a task table (see task_table.py) of every registered task
+# returns False if numpy is not installed
+def create_task_table():
+    global table
+    try:
+        import task_table
+    except ImportError:
+        return False
+    table = task_table.TaskTable()
+    for task in tasks_by_code.values():
+        table.add(task)
+    return True
+
+
+# returns a "dd/mm/yyyy" due date as a day number (see datetime.date.toordinal)
+# returns None if the date does not exist
+def date_ordinal(date):
+    try:
+        day, month, year = date.split("/")
+        return datetime.date(int(year), int(month), int(day)).toordinal()
+    except ValueError:
+        return None
+
+
+# returns the due day of a task for sorting, with tasks with a due date that does not exist last
+def due_day_key(task):
+    return NO_DUE_DAY if task.due_day is None else task.due_day
+
+
+# returns list of the lowercase words in some text, for searching
+def search_words(text):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+# returns the path of a folder as the list of its positions among its parent's sub folders
+# (folders keep their relative order when a folder is sorted, so the path stays valid)
+def folder_path(folder):
+    path = []
+    while folder.parent is not None:
+        path.insert(0, folder.parent.subfolders().index(folder))
+        folder = folder.parent
+    return path
+
+
+# returns the folder at the end of a path created by folder_path
+def find_folder(main_folder, path):
+    folder = main_folder
+    for ind in path:
+        folder = folder.subfolders()[ind]
+    return folder
+
+
+# reads the task file in one pass into a dictionary of task code:saved task lines
+# (each task is saved as 5 lines: code, title, description, due date, priority)
+def index_tasks(fo):
+    lines = [line.rstrip("\r\n") for line in fo]
+    return {lines[i]: lines[i:i + 5] for i in range(0, len(lines) - 4, 5)}
+
+
+# reads the task file in one pass into a dictionary of task code:position of the task in the file
+def index_task_offsets(fo):
+    offsets = dict()
+    offset = 0
+    for i, line in enumerate(fo):
+        if i % 5 == 0:
+            offsets[line.rstrip(b"\r\n").decode(SAVE_ENCODING)] = offset
+        offset += len(line)
+    return offsets
+
+
+# recursive algorithm creating folders from text file
+# creates directory as a tree data structure
+# when lazy, only the positions of the tasks in the task file are kept
+def createfolder(parentfolder, fi, lazy=False):
+    if lazy:
+        parentfolder.unloaded = []
+    next_line = fi.readline().strip()
+    while next_line != "}" and next_line != '':
+        if next_line[-1] == "{":
+            new_folder = Folder(next_line[:-1], parentfolder)
+            createfolder(new_folder, fi, lazy)
+            parentfolder.add(new_folder)
+        elif lazy:
+            if next_line in task_index:
+                parentfolder.unloaded.append(task_index[next_line])
+        else:
+            parentfolder.taskadd(next_line, parentfolder)
+        next_line = fi.readline().strip()
+    return
+
+
+# reads in all folders and tasks from the save files, returning the main folder
+# when lazy, the tasks of each folder are only read in by read_folder_tasks
+def load_folders(title, lazy=False):
+    global task_index, save_generation
+    if lazy:
+        fo = open(TASK_FILE, 'rb')
+        task_index = index_task_offsets(fo)
+        for code in task_index:  # tasks are not registered until their folder is opened
+            use_task_code(code)
+    else:
+        fo = open(TASK_FILE, 'r', encoding=SAVE_ENCODING, newline='\n')
+        task_index = index_tasks(fo)
+    fo.close()
+    fi = open(FOLDER_FILE, 'r', encoding=SAVE_ENCODING, newline='\n')
+    first_line = fi.readline()
+    if first_line.startswith(GENERATION_PREFIX):
+        save_generation = int(first_line[len(GENERATION_PREFIX):])
+    else:  # saved before generations were kept
+        save_generation = 0
+        fi.seek(0)
+    main_folder = Folder(title)
+    createfolder(main_folder, fi, lazy)
+    fi.close()
+    task_index = dict()
+    return main_folder
+
+
+# reads in the tasks of a folder loaded lazily by load_folders
+def read_folder_tasks(folder):
+    fo = open(TASK_FILE, 'rb')
+    for offset in folder.unloaded:
+        fo.seek(offset)
+        lines = [fo.readline().rstrip(b"\r\n").decode(SAVE_ENCODING) for i in range(5)]
+        task = Task(lines[0], lines[1], lines[2], lines[3], int(lines[4]), folder)
+        folder.add(task)
+        register_task(task)
+    fo.close()
+    folder.unloaded = None
+
+
+# returns True if the tasks of a folder and all of its sub folders have been read in
+def all_loaded(folder):
+    return folder.unloaded is None and all(all_loaded(item) for item in folder.subfolders())
+
+
+# reads in the tasks of every folder that has not been opened yet
+def load_all_contents(folder, load_contents):
+    if folder.unloaded is not None:
+        load_contents(folder)
+    for item in folder.subfolders():
+        load_all_contents(item, load_contents)
+
+
+# returns a copy of a folder as (title, sub folders, task data, unloaded) that can be saved while the folder keeps
+# changing, where unloaded is the list of task file positions of a folder that has not been read in (otherwise None)
+# (the tasks of folders that have not been read in are copied from the old task file when saving, see save_contents)
+def snapshot_folders(folder):
+    tasks = [item.data for item in folder.contents if type(item) is Task]
+    return folder.title, [snapshot_folders(item) for item in folder.folders], tasks, folder.unloaded
+
+
+# saves all tasks, folders, and their paths in the respective text files
+# the saved lines of tasks that have not been read in are copied from the old task file (old_tasks) as they are,
+# adding (old positions, new positions) to moved for each folder that has them
+def save_contents(snapshot, taskfold, foldfold, old_tasks=None, moved=None):
+    title, folders, tasks, unloaded = snapshot
+    for folder in folders:
+        foldfold.write(folder[0] + "{\n")
+        save_contents(folder, taskfold, foldfold, old_tasks, moved)
+        foldfold.write("}\n")
+    for data in tasks:
+        foldfold.write(data[0] + '\n')
+        for attribute in data:
+            taskfold.write((str(attribute) + "\n").encode(SAVE_ENCODING))
+    if unloaded:
+        offsets = []
+        for offset in unloaded:
+            old_tasks.seek(offset)
+            lines = [old_tasks.readline().rstrip(b"\r\n") + b"\n" for i in range(5)]
+            foldfold.write(lines[0].decode(SAVE_ENCODING))
+            offsets.append(taskfold.tell())
+            taskfold.write(b"".join(lines))
+        moved.append((unloaded, offsets))
+
+
+# rewrites both save files from the main folder
+def save_folders(main_folder):
+    save_snapshot(snapshot_folders(main_folder))
+
+
+# rewrites both save files from a snapshot of the main folder
+# files are written next to the old ones and then swapped in, so an interrupted save keeps the old files
+# the task file positions of folders that have not been read in are changed in place to where their tasks were moved,
+# so they stay right for the folders and for any snapshot taken before this one was saved
+# the task file is swapped in first, so the folder file and its generation only change once both files are written
+# (old folder files still find their tasks in the new task file by code)
+def save_snapshot(snapshot):
+    global save_generation
+    old_tasks = open(TASK_FILE, 'rb') if os.path.exists(TASK_FILE) else None
+    moved = []
+    fi = open(FOLDER_FILE + '.tmp', 'w', encoding=SAVE_ENCODING, newline='\n')
+    fo = open(TASK_FILE + '.tmp', 'wb')
+    fi.write(GENERATION_PREFIX + str(save_generation + 1) + "\n")
+    save_contents(snapshot, fo, fi, old_tasks, moved)
+    fi.close()
+    fo.close()
+    if old_tasks is not None:
+        old_tasks.close()
+    os.replace(TASK_FILE + '.tmp', TASK_FILE)
+    for offsets, new_offsets in moved:
+        offsets[:] = new_offsets
+    os.replace(FOLDER_FILE + '.tmp', FOLDER_FILE)
+    save_generation += 1
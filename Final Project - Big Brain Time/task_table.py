@@ -0,0 +1,105 @@
+# --------------------------------------------------------------------
+# Program: Task Table
+# Description: Table of every task read in, stored as NumPy columns
+#   (due day, priority, folder and removal). Kept up to date by
+#   task_data as tasks are registered and unregistered, so counting
+#   tasks across the whole folder tree is a few array operations
+#   instead of a walk through every folder. Needs NumPy, see
+#   task_data.create_task_table.
+# --------------------------------------------------------------------
+
+import numpy as np
+
+NO_DUE_DAY = np.iinfo(np.int32).max  # due day of tasks with a due date that does not exist
+START_ROWS = 1024
+
+
+# class for counting tasks with array operations
+class TaskTable:
+    """columns of task data, where row i of every column belongs to tasks[i]
+    rows of removed tasks are kept (and reused if the task is added back)"""
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.length = 0  # rows in use
+        self.tasks = []
+        self.due_day = np.zeros(START_ROWS, np.int32)
+        self.priority = np.zeros(START_ROWS, np.int32)
+        self.folder = np.zeros(START_ROWS, np.int32)  # folder ids, see folder_id
+        self.removed = np.zeros(START_ROWS, np.bool_)
+        self.folders = []  # folder id:folder
+        self.folder_ids = dict()  # folder:folder id
+
+    # returns the id of a folder, giving it one if it does not have one yet
+    def folder_id(self, folder):
+        folder_id = self.folder_ids.get(folder)
+        if folder_id is None:
+            folder_id = self.folder_ids[folder] = len(self.folders)
+            self.folders.append(folder)
+        return folder_id
+
+    # doubles the number of rows each column can hold
+    def grow(self):
+        size = len(self.due_day) * 2
+        self.due_day = np.resize(self.due_day, size)
+        self.priority = np.resize(self.priority, size)
+        self.folder = np.resize(self.folder, size)
+        self.removed = np.resize(self.removed, size)
+
+    # adds a task or updates its row, marking it as not removed
+    def add(self, task):
+        row = task.row
+        if row is None or row >= self.length or self.tasks[row] is not task:
+            if self.length == len(self.due_day):
+                self.grow()
+            row = task.row = self.length
+            self.tasks.append(task)
+            self.length += 1
+        self.due_day[row] = NO_DUE_DAY if task.due_day is None else task.due_day
+        self.priority[row] = task.priority
+        self.folder[row] = self.folder_id(task.parent)
+        self.removed[row] = False
+
+    # marks a task taken out of the folder tree as removed (completed tasks are counted by the main program)
+    def remove(self, task):
+        if task.row is not None and task.row < self.length and self.tasks[task.row] is task:
+            self.removed[task.row] = True
+
+    # --------------------QUERIES--------------------
+
+    # returns a boolean array of the rows of tasks that are not removed
+    def active(self):
+        return ~self.removed[:self.length]
+
+    # returns a boolean array of the rows of tasks due between two days (inclusive) that are not removed
+    def due_between(self, first_day, last_day):
+        due_day = self.due_day[:self.length]
+        return (due_day >= first_day) & (due_day <= last_day) & self.active()
+
+    def overdue(self, today):
+        return self.due_between(0, today - 1)
+
+    # returns an array of the number of tasks due on each day between two days (inclusive)
+    def count_by_day(self, first_day, last_day):
+        days = self.due_day[:self.length][self.due_between(first_day, last_day)]
+        return np.bincount(days - first_day, minlength=last_day - first_day + 1)
+
+    # returns dictionary of priority:number of tasks with that priority
+    def priority_counts(self, rows=None):
+        if rows is None:
+            rows = self.active()
+        priorities, counts = np.unique(self.priority[:self.length][rows], return_counts=True)
+        return dict(zip(priorities.tolist(), counts.tolist()))
+
+    # returns dictionary of folder:number of the given rows in that folder, leaving out folders with none
+    # when include_sub_folders is True, the tasks of each folder's sub folders are counted as well
+    def count_by_folder(self, rows, include_sub_folders=True):
+        counts = np.bincount(self.folder[:self.length][rows], minlength=len(self.folders))
+        folder_counts = dict()
+        for folder_id in np.flatnonzero(counts).tolist():
+            folder = self.folders[folder_id]
+            while folder is not None:
+                folder_counts[folder] = folder_counts.get(folder, 0) + int(counts[folder_id])
+                folder = folder.parent if include_sub_folders else None
+        return folder_counts
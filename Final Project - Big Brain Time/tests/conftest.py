@@ -0,0 +1,18 @@
+import os
+import sys
+import pytest
+
+# the program's modules are imported from the project folder, as when running main_final.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage_helpers
+
+
+# runs a test in an empty folder with the example save files, and no tasks read in
+@pytest.fixture
+def save_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    storage_helpers.write_save_files()
+    storage_helpers.forget_tasks()
+    yield
+    storage_helpers.forget_tasks()
@@ -0,0 +1,80 @@
+# save files, change records and folder tree helpers shared by the storage tests
+
+import task_data as td
+import journal
+
+FOLDERS = """School{
+Math{
+m1
+m2
+}
+s1
+}
+Work{
+w1
+w2
+}
+"""
+
+TASKS = [("m1", "Algebra", "Chapter 3 questions", "20/02/2026", 5),
+         ("m2", "Geometry", "Proofs", "21/02/2026", 2),
+         ("s1", "Timetable", "Print it", "01/02/2026", 1),
+         ("w1", "Meeting", "Monday", "02/03/2026", 7),
+         ("w2", "Invoice", "Send to client", "31/02/2026", 3)]  # due date that does not exist
+
+# one of each kind of change record, in an order where later records depend on earlier ones
+RECORDS = [{"op": "add", "folder": [1], "task": ["n1", "Report", "Write the report", "05/03/2026", 4]},
+           {"op": "add", "folder": [0], "title": "History"},
+           {"op": "move", "code": "m1", "folder": [0, 1]},
+           {"op": "edit", "code": "w1", "task": ["w1", "Meeting notes", "Send them round", "10/03/2026", 9]},
+           {"op": "remove", "code": "s1"},
+           {"op": "remove", "folder": [0, 0]},
+           {"op": "add", "folder": [0, 0], "task": ["n2", "Essay", "", "12/03/2026", 6]}]
+
+WORK_RECORDS = [RECORDS[0], RECORDS[3]]  # records only changing the Work folder
+
+
+# writes the save files in the current folder
+def write_save_files():
+    with open(td.FOLDER_FILE, 'w') as fi:
+        fi.write(FOLDERS)
+    with open(td.TASK_FILE, 'w') as fo:
+        fo.write("".join(str(attribute) + "\n" for task in TASKS for attribute in task))
+
+
+# forgets every task read in, as if the program had just started
+def forget_tasks():
+    td.tasks_by_code.clear()
+    td.due_dates.clear()
+    td.search_index = td.SearchIndex()
+    td.next_task_id = 0
+    td.table = None
+    td.save_generation = 0
+
+
+# returns a folder as (title, sub folders, sorted task data) to compare folder trees
+def shape(folder):
+    tasks = sorted(item.data for item in folder.contents if type(item) is td.Task)
+    return folder.title, [shape(item) for item in folder.subfolders()], tasks
+
+
+# reads in every task of a folder tree from a storage engine and returns its shape
+def loaded_shape(main_folder, storage):
+    td.load_all_contents(main_folder, storage.load_contents)
+    return shape(main_folder)
+
+
+# returns the shape of the save files with records applied in memory
+def expected_shape(records):
+    main_folder = td.load_folders("Main")
+    for record in records:
+        journal.apply_change(main_folder, record)
+    result = shape(main_folder)
+    forget_tasks()
+    return result
+
+
+# reads the folder tree back in with a new storage engine, as when the program is started again
+def reload(storage, lazy=False):
+    forget_tasks()
+    return loaded_shape(storage.load_folders("Main", lazy), storage)
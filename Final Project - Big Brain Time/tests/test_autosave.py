@@ -0,0 +1,158 @@
+# the autosaver must write queued changes in as few writes as possible, in the order they were made
+
+import time
+import pytest
+import task_data as td
+import journal
+import autosave
+from storage_helpers import RECORDS, WORK_RECORDS, expected_shape, reload
+
+pytestmark = pytest.mark.usefixtures("save_files")
+
+
+# storage engine keeping a list of the writes made to it
+class RecordingStorage:
+    compact_limit = 3
+
+    def __init__(self):
+        self.writes = []
+
+    def append_all(self, records):
+        self.writes.append(("records", list(records)))
+
+    @staticmethod
+    def snapshot(main_folder):
+        return main_folder
+
+    def write_snapshot(self, snapshot):
+        self.writes.append(("snapshot", snapshot))
+
+    def save_user_data(self, user):
+        self.writes.append(("user", user.taskscompleted))
+
+
+def test_autosaver_batches_changes():
+    storage = RecordingStorage()
+    saver = autosave.AutoSaver(storage, delay=60)  # only written when flushed
+    for record in RECORDS[:3]:
+        saver.append(record)
+    user = td.UserData()
+    user.taskscompleted = [["01/02/2026", 1]]
+    saver.save_user_data(user)
+    user.taskscompleted = [["01/02/2026", 2]]
+    saver.save_user_data(user)
+    assert saver.needs_compaction()
+    saver.flush()
+    assert storage.writes == [("records", RECORDS[:3]), ("user", [["01/02/2026", 2]])]
+
+    # records queued before a compaction are in its snapshot, so only the records after it are written
+    storage.writes = []
+    saver.append(RECORDS[3])
+    saver.compact("tree")
+    saver.append(RECORDS[4])
+    assert not saver.needs_compaction()
+    saver.close()
+    assert storage.writes == [("snapshot", "tree"), ("records", [RECORDS[4]])]
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_autosaver_saves_journal(lazy):
+    expected = expected_shape(WORK_RECORDS)
+    saver = autosave.AutoSaver(journal.Journal(), delay=0)
+    main_folder = saver.load_folders("Main", lazy)
+    if lazy:
+        saver.load_contents(main_folder.subfolders()[1])
+    for record in WORK_RECORDS:
+        journal.apply_change(main_folder, record)
+        saver.append(record)
+    saver.flush()
+    assert journal.Journal().read() == WORK_RECORDS
+    saver.compact(main_folder)
+    saver.close()
+    assert journal.Journal().read() == []
+    assert reload(journal.Journal(), lazy) == expected
+
+
+# storage engine that fails to write a number of times before it works
+class FailingStorage(RecordingStorage):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def append_all(self, records):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk full")
+        super().append_all(records)
+
+
+def test_autosaver_writes_failed_changes_with_the_next_batch(monkeypatch):
+    monkeypatch.setattr(autosave, "RETRY_DELAY", 60)  # only written again when more changes are queued
+    storage = FailingStorage(failures=2)
+    saver = autosave.AutoSaver(storage, delay=0)
+    saver.append(RECORDS[0])
+    saver.flush()  # does not raise, the error is reported by the main loop
+    assert isinstance(saver.take_error(), OSError)
+    assert saver.take_error() is None  # each error is only reported once
+    saver.append(RECORDS[1])
+    saver.flush()
+    assert storage.writes == [] and saver.unwritten == [("record", RECORDS[0]), ("record", RECORDS[1])]
+    saver.append(RECORDS[2])
+    saver.close()
+    assert storage.writes == [("records", RECORDS[:3])]
+
+
+def test_autosaver_writes_failed_changes_again_after_a_while(monkeypatch):
+    monkeypatch.setattr(autosave, "RETRY_DELAY", 0.01)
+    storage = FailingStorage(failures=1)
+    saver = autosave.AutoSaver(storage, delay=0)
+    saver.append(RECORDS[0])
+    saver.flush()
+    assert isinstance(saver.take_error(), OSError)
+    for i in range(500):  # nothing else is queued
+        if storage.writes:
+            break
+        time.sleep(0.01)
+    assert storage.writes == [("records", RECORDS[:1])]
+    saver.close()
+
+
+def test_autosaver_keeps_changes_after_a_failed_compaction():
+    class FailingSnapshots(RecordingStorage):
+        def write_snapshot(self, snapshot):
+            raise OSError("disk full")
+
+    saver = autosave.AutoSaver(FailingSnapshots(), delay=60)
+    saver.append(RECORDS[0])
+    saver.compact("tree")
+    saver.append(RECORDS[1])
+    with pytest.raises(OSError):
+        saver.close()  # the changes that could not be written are reported when closing
+    # the records written before the compaction are in its snapshot, so only the snapshot and later records are kept
+    assert saver.unwritten == [("compact", "tree"), ("record", RECORDS[1])]
+    assert saver.storage.writes == []
+
+
+def test_failed_journal_writes_are_cut_off(monkeypatch):
+    log = journal.Journal()
+    log.append(RECORDS[0])
+
+    class FullFile:  # writes only part of what it is given before the disk is full
+        def __init__(self, fi):
+            self.fi = fi
+
+        def __getattr__(self, name):
+            return getattr(self.fi, name)
+
+        def write(self, data):
+            if len(data) > 10:
+                return self.fi.write(data[:10])
+            raise OSError("disk full")
+
+    real_open = open
+    monkeypatch.setattr(journal, "open", lambda *args, **kwargs: FullFile(real_open(*args, **kwargs)), raising=False)
+    with pytest.raises(OSError):
+        log.append(RECORDS[1])
+    monkeypatch.delattr(journal, "open")
+    log.append(RECORDS[2])  # written again after the failed write
+    assert journal.Journal().read() == [RECORDS[0], RECORDS[2]]
@@ -0,0 +1,44 @@
+# changes saved in the task database must read back in as the same folder tree
+
+import pytest
+import task_data as td
+import database
+from storage_helpers import RECORDS, expected_shape, reload, forget_tasks
+
+pytestmark = pytest.mark.usefixtures("save_files")
+
+
+# returns a new database filled from the save files, reopened as when the program is started again
+def imported_database():
+    storage = database.TaskDatabase()
+    storage.load_folders("Main")
+    storage.connection.close()
+    forget_tasks()
+    return database.TaskDatabase()
+
+
+def test_database_applies_records():
+    expected = expected_shape(RECORDS)
+    storage = imported_database()
+    storage.append_all(RECORDS[:3])
+    for record in RECORDS[3:]:
+        storage.append(record)
+    storage.connection.close()
+    assert reload(database.TaskDatabase()) == expected
+
+
+# returns list of (day, task codes) from a dictionary of due day:list of tasks
+def codes_by_day(by_day):
+    return sorted((day, [task.taskcode for task in tasks]) for day, tasks in by_day.items())
+
+
+FEBRUARY_TASKS = [(td.date_ordinal("01/02/2026"), ["s1"]), (td.date_ordinal("20/02/2026"), ["m1"]),
+                  (td.date_ordinal("21/02/2026"), ["m2"])]
+
+
+def test_database_finds_tasks_due_between():
+    storage = imported_database()
+    main_folder = storage.load_folders("Main")
+    by_day = storage.tasks_due_between(main_folder, td.date_ordinal("01/02/2026"), td.date_ordinal("28/02/2026"))
+    assert codes_by_day(by_day) == FEBRUARY_TASKS
+    assert by_day[td.date_ordinal("20/02/2026")][0] is td.tasks_by_code["m1"]  # tasks read in are not copied
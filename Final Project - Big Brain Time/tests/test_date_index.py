@@ -0,0 +1,51 @@
+# the due date index must find the same tasks as looking at the due day of every task
+
+import random
+import task_data as td
+
+FIRST_DAY = td.date_ordinal("01/01/2026")
+
+
+def make_task(i, day):
+    date = "30/02/2026" if day is None else td.datetime.date.fromordinal(day).strftime("%d/%m/%Y")
+    return td.Task(str(i), "Task", "", date, 0, None)
+
+
+# returns list of tasks due between two days (inclusive), soonest first, in the order they were added on each day
+def due_between(tasks, first_day, last_day):
+    due = [task for task in tasks if task.due_day is not None and first_day <= task.due_day <= last_day]
+    return sorted(due, key=lambda task: task.due_day)
+
+
+def test_date_index_queries_match_a_plain_search():
+    random.seed(5)
+    index = td.DateIndex()
+    tasks = []
+    for i in range(400):
+        if tasks and random.random() < 0.25:
+            task = tasks.pop(random.randrange(len(tasks)))
+            index.remove(task)
+        else:
+            task = make_task(i, None if random.random() < 0.05 else FIRST_DAY + random.randrange(60))
+            index.add(task)
+            tasks.append(task)
+    assert index.days == sorted({task.due_day for task in tasks if task.due_day is not None})
+    for i in range(50):
+        first_day = FIRST_DAY + random.randrange(-5, 65)
+        last_day = first_day + random.randrange(0, 20)
+        assert index.between(first_day, last_day) == due_between(tasks, first_day, last_day)
+        assert index.overdue(first_day) == due_between(tasks, 0, first_day - 1)
+        assert index.upcoming(first_day) == due_between(tasks, first_day, first_day + 6)
+        assert index.on(first_day) == due_between(tasks, first_day, first_day)
+        assert index.by_day(first_day, last_day) == {day: due_between(tasks, day, day)
+                                                     for day in range(first_day, last_day + 1)
+                                                     if due_between(tasks, day, day)}
+
+
+def test_removing_the_last_task_of_a_day_removes_the_day():
+    index = td.DateIndex()
+    task = make_task(1, FIRST_DAY)
+    index.add(task)
+    index.remove(task)
+    index.remove(task)  # removing a task that is not in the index does nothing
+    assert index.days == [] and index.between(0, FIRST_DAY * 2) == []
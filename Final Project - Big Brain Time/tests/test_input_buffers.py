@@ -0,0 +1,59 @@
+# the input box's gap buffers must hold the same text and widths as a plain string and list
+
+import os
+import random
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pygameplus = pytest.importorskip("pygameplus")  # needs pygame
+
+
+# makes random edits to a buffer and a plain list the same way, mostly typing and deleting near the last edit
+def random_edits(buffer, plain, check, new_item):
+    random.seed(11)
+    index = 0
+    for i in range(2000):
+        if random.random() < 0.2:
+            index = random.randint(0, len(plain))  # caret moved
+        if plain and random.random() < 0.3:
+            start = min(index, len(plain) - 1)
+            end = min(start + random.randint(1, 3), len(plain))
+            buffer.delete(start, end)
+            del plain[start:end]
+            index = start
+        else:
+            item = new_item()
+            buffer.insert(index, item)
+            plain.insert(index, item)
+            index += 1
+        check()
+
+
+def test_gap_buffer_matches_a_string():
+    buffer = pygameplus.GapBuffer()
+    plain = []
+
+    def check():
+        text = "".join(plain)
+        assert "".join(buffer) == text and len(buffer) == len(text)
+        start = random.randint(0, len(text))
+        end = random.randint(start, len(text))
+        assert "".join(buffer.slice(start, end)) == text[start:end]
+
+    random_edits(buffer, plain, check, lambda: random.choice("abc xyz"))
+
+
+def test_width_buffer_matches_a_list():
+    buffer = pygameplus.WidthBuffer()
+    plain = []
+
+    def check():
+        assert list(buffer) == plain
+        index = random.randint(0, len(plain))
+        assert buffer.sum_to(index) == sum(plain[:index])
+        total = random.randint(-3, sum(plain) + 3)
+        ends = [sum(plain[:i + 1]) for i in range(len(plain))]
+        assert buffer.count_to(total) == len([end for end in ends if end <= total])
+        assert buffer.count_to(total, below=True) == len([end for end in ends if end < total])
+
+    random_edits(buffer, plain, check, lambda: random.randint(0, 12))  # 0 for letters with no width
@@ -0,0 +1,72 @@
+# changes saved in the change journal must read back in as the same folder tree
+
+import os
+import pytest
+import task_data as td
+import journal
+from storage_helpers import RECORDS, WORK_RECORDS, expected_shape, reload, shape
+
+pytestmark = pytest.mark.usefixtures("save_files")
+
+
+def test_journal_replays_records():
+    expected = expected_shape(RECORDS)
+    log = journal.Journal()
+    for record in RECORDS:
+        log.append(record)
+    assert reload(journal.Journal()) == expected
+    # replayed records are compacted into the save files when loading
+    assert journal.Journal().read() == []
+    assert reload(journal.Journal()) == expected
+
+
+def test_journal_compaction():
+    expected = expected_shape(WORK_RECORDS)
+    log = journal.Journal()
+    main_folder = log.load_folders("Main")
+    for record in WORK_RECORDS:
+        journal.apply_change(main_folder, record)
+        log.append(record)
+    log.compact(main_folder)
+    assert log.read() == []
+    assert shape(main_folder) == expected
+    assert reload(journal.Journal()) == expected
+
+
+# saves records in the journal and applies them in memory, returning the main folder
+def journal_records(log, records, lazy=False):
+    main_folder = log.load_folders("Main", lazy)
+    td.load_all_contents(main_folder, log.load_contents)
+    for record in records:
+        journal.apply_change(main_folder, record)
+        log.append(record)
+    return main_folder
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_records_already_in_the_save_files_are_not_replayed(lazy):
+    expected = expected_shape(RECORDS)
+    log = journal.Journal()
+    main_folder = journal_records(log, RECORDS, lazy)
+    td.save_snapshot(log.snapshot(main_folder))  # the program stopped before the journal was cleared
+    assert reload(journal.Journal(), lazy) == expected
+    assert reload(journal.Journal(), lazy) == expected
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_records_are_replayed_if_only_the_task_file_was_swapped_in(lazy, monkeypatch):
+    expected = expected_shape(RECORDS)
+    log = journal.Journal()
+    main_folder = journal_records(log, RECORDS, lazy)
+    replace = os.replace
+
+    def stop_before_folder_file(source, destination):
+        if destination == td.FOLDER_FILE:
+            raise OSError("stopped")
+        replace(source, destination)
+
+    monkeypatch.setattr(os, "replace", stop_before_folder_file)
+    with pytest.raises(OSError):
+        log.compact(main_folder)
+    monkeypatch.setattr(os, "replace", replace)
+    assert reload(journal.Journal(), lazy) == expected
@@ -0,0 +1,91 @@
+# folders loaded lazily must read back in the same as folders loaded straight away, and compacting the
+# journal must keep the tasks of folders that have not been opened
+
+import pytest
+import task_data as td
+import journal
+import database
+from storage_helpers import RECORDS, WORK_RECORDS, expected_shape, reload, loaded_shape
+from test_database import imported_database, codes_by_day, FEBRUARY_TASKS
+
+pytestmark = pytest.mark.usefixtures("save_files")
+
+
+def test_lazy_loading_reads_the_same_tree():
+    assert reload(journal.Journal(), lazy=True) == expected_shape([])
+
+
+def test_lazy_journal_replays_records():
+    expected = expected_shape(RECORDS)
+    log = journal.Journal()
+    for record in RECORDS:
+        log.append(record)
+    assert reload(journal.Journal(), lazy=True) == expected
+    assert reload(journal.Journal(), lazy=True) == expected
+
+
+def test_lazy_compaction_keeps_unopened_folders():
+    expected = expected_shape(WORK_RECORDS)
+    log = journal.Journal()
+    main_folder = log.load_folders("Main", lazy=True)
+    log.load_contents(main_folder.subfolders()[1])  # Work is opened, while School is not
+    for record in WORK_RECORDS:
+        journal.apply_change(main_folder, record)
+        log.append(record)
+    log.compact(main_folder)
+    assert log.read() == []
+    assert main_folder.subfolders()[0].unloaded is not None  # compacting did not read School in
+    # folders that were not opened are still read in from where their tasks were moved to
+    assert loaded_shape(main_folder, log) == expected
+    assert reload(journal.Journal(), lazy=True) == expected
+
+
+def test_lazy_compaction_keeps_unopened_folders_after_two_saves():
+    record = {"op": "add", "folder": [0, 0], "task": ["n3", "Quiz", "", "03/03/2026", 2]}
+    expected = expected_shape([record])
+    log = journal.Journal()
+    main_folder = log.load_folders("Main", lazy=True)
+    log.load_contents(main_folder.subfolders()[0].subfolders()[0])
+    journal.apply_change(main_folder, record)  # saved before Work, so Work's tasks move down the task file
+    first = log.snapshot(main_folder)
+    second = log.snapshot(main_folder)
+    log.write_snapshot(first)
+    log.write_snapshot(second)  # taken before the first was saved, so its positions must have been updated
+    assert reload(journal.Journal(), lazy=True) == expected
+
+
+def test_lazy_database_applies_records():
+    expected = expected_shape(RECORDS)
+    storage = imported_database()
+    storage.append_all(RECORDS)
+    storage.connection.close()
+    assert reload(database.TaskDatabase(), lazy=True) == expected
+
+
+def test_lazy_database_finds_tasks_due_between():
+    storage = imported_database()
+    main_folder = storage.load_folders("Main", lazy=True)
+    by_day = storage.tasks_due_between(main_folder, td.date_ordinal("01/02/2026"), td.date_ordinal("28/02/2026"))
+    assert codes_by_day(by_day) == FEBRUARY_TASKS
+    # tasks of folders that have not been opened are given in their folder, without reading the folder in
+    math = main_folder.subfolders()[0].subfolders()[0]
+    assert by_day[td.date_ordinal("20/02/2026")][0].parent is math
+    assert math.unloaded is not None and "m1" not in td.tasks_by_code
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_titles_that_are_not_ascii_keep_their_positions(lazy):
+    # written as UTF-8 whatever the system's encoding, with only "\n" ending lines (not other line separators)
+    record = {"op": "add", "folder": [0, 0], "task": ["n4", "Révision – 数学", "One\u2028line", "04/03/2026", 1]}
+    expected = expected_shape([record])
+    log = journal.Journal()
+    main_folder = log.load_folders("Main", lazy)
+    if lazy:
+        log.load_contents(main_folder.subfolders()[0].subfolders()[0])
+    journal.apply_change(main_folder, record)
+    log.compact(main_folder)
+    with open(td.TASK_FILE, 'rb') as fo:
+        assert "Révision – 数学\nOne\u2028line\n".encode('utf-8') in fo.read()
+    assert loaded_shape(main_folder, log) == expected
+    assert reload(journal.Journal(), lazy) == expected
+    assert reload(journal.Journal(), not lazy) == expected
@@ -0,0 +1,88 @@
+# a cached component is only drawn again when something in it changes, not when the layout changes elsewhere
+
+import pygame
+import pytest
+import frame
+
+
+# drawable filling its rect with a colour
+class Block(frame.Drawable):
+    def __init__(self):
+        super().__init__()
+        self.rect.w, self.rect.h = 100, 40
+
+    def draw(self, win):
+        self.set_relative_rect()
+        pygame.draw.rect(win, (255, 0, 0), self.get_rect())
+
+
+# returns the window component, a cached row in it and a drawable in the row
+def make_row():
+    window = frame.Component(pygame.Surface((400, 300)))
+    row = frame.Component(window, frame.RELATIVE)
+    row.layout.w = frame.MATCH
+    row.rect.h = 60
+    row.cached = True
+    drawable = Block()
+    drawable.set_relative(row)
+    return window, row, drawable
+
+
+# draws the window the way the main loop does, returning the window surface
+def draw(window, win=None):
+    if win is None:
+        win = pygame.Surface((400, 300))
+        frame.mark_all_dirty()
+    else:
+        frame.mark_dirty((0, 0, 400, 300))
+    frame.take_dirty_rects()
+    window.draw(win)
+    return win
+
+
+@pytest.fixture(autouse=True)
+def clean_frame():
+    yield
+    frame.dirty_rects = []
+    frame.drawing_rects = None
+
+
+def test_cache_kept_when_the_layout_changes_elsewhere():
+    window, row, drawable = make_row()
+    win = draw(window)
+    cache = row.cache
+    assert cache is not None
+
+    other = Block()
+    other.set_relative(window)  # changes the layout, but not the row
+    draw(window, win)
+    assert row.cache is cache
+
+
+def test_cache_dropped_when_something_in_it_changes():
+    window, row, drawable = make_row()
+    draw(window)
+    assert row.cache is not None
+    drawable.mark_changed()
+    assert row.cache is None
+
+
+def test_cache_dropped_when_the_row_changes_size():
+    window, row, drawable = make_row()
+    win = draw(window)
+    cache = row.cache
+    row.rect.h = 80
+    frame.invalidate_layout()
+    draw(window, win)
+    assert row.cache is not cache
+    assert row.cache.get_size() == (400, 80)
+
+
+def test_reused_row_cache_dropped():
+    pool = frame.RowPool(lambda parent, item: make_row()[1], lambda row, item: None)
+    window, row, drawable = make_row()
+    draw(window)
+    assert row.cache is not None
+    pool.release(row, "old item")
+    assert pool.get(window, "new item") is row
+    assert row.cache is None
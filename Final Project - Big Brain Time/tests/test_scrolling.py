@@ -0,0 +1,110 @@
+# scrolling moves the drawables where laying them out again would put them, without changing the layout
+
+import pygame
+import pytest
+import frame
+
+ROWS = 30
+ROW_H = 60
+
+
+# drawable that records whether the mouse was over it when it was last processed
+class Target(frame.Drawable):
+    def __init__(self):
+        super().__init__()
+        self.rect.w, self.rect.h = 100, 40
+        self.hovered = False
+
+    def process(self, click_bool, release_bool, mouse_pos, used_process):
+        x, y = mouse_pos
+        self.hovered = self.rect.x <= x < self.rect.x + self.rect.w and self.rect.y <= y < self.rect.y + self.rect.h
+        return used_process
+
+
+# returns the window component and a scrollable page of ROWS rows, each with a target in it
+def make_page():
+    window = frame.Component(pygame.Surface((400, 300)))
+    page = frame.Component(window, frame.RELATIVE)
+    page.layout.w = frame.MATCH
+    page.layout.h = frame.MATCH
+    page.scrollable = True
+    targets = []
+    for i in range(ROWS):
+        row = frame.Component(page, frame.RELATIVE)
+        row.layout.w = frame.MATCH
+        row.rect.h = ROW_H
+        if i > 0:
+            row.layout.align_top = i - 1
+        target = Target()
+        target.set_relative(row)
+        target.layout.gravity = "left centery"
+        target.layout.margin_left = 10
+        targets.append(target)
+    window.layout_solver.solve()
+    return window, page, targets
+
+
+# returns list of the rects of every drawable in a component tree
+def all_rects(component):
+    rects = []
+    for item in component.contents:
+        rects.append(item.rect.get())
+        if isinstance(item, frame.Component):
+            rects += all_rects(item)
+    return rects
+
+
+# scrolls the page by the turns of the mouse wheel (4 up, 5 down) until it stops
+def scroll(page, *buttons):
+    page.scroll([pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=button) for button in buttons])
+    while page.scroll_left:
+        page.scroll_step()
+
+
+@pytest.fixture(autouse=True)
+def clean_frame():
+    frame.scrolled_areas = []
+    yield
+    frame.scrolled_areas = []
+
+
+def test_scrolling_moves_drawables_where_laying_out_again_would():
+    window, page, targets = make_page()
+    version = frame.layout_version
+    scroll(page, 5, 5, 5, 5)
+    assert page.scroll_y < 0
+    assert frame.layout_version == version
+    scrolled_rects = all_rects(window)
+
+    frame.invalidate_layout()
+    window.layout_solver.solve()
+    assert all_rects(window) == scrolled_rects
+
+
+def test_hit_grid_finds_drawables_after_scrolling():
+    window, page, targets = make_page()
+    window.process(False, False, (20, 20), None)
+    assert targets[0].hovered
+    scroll(page, 5, 5, 5)
+    target = next(target for target in targets if target.rect.y > 150)
+    targets[0].hovered = False
+    window.process(False, False, (target.rect.x + 5, target.rect.y + 5), None)
+    assert target.hovered
+    assert [target for target in targets if target.hovered] == [target]
+
+
+def test_content_height_follows_the_contents():
+    window, page, targets = make_page()
+    assert page.content_h == ROWS * ROW_H
+    scroll(page, *[5] * ROWS * 4)
+    assert page.scroll_y == page.get_h() - page.content_h  # stopped at the bottom of the contents
+    assert page.content_h == ROWS * ROW_H
+
+    page.contents[-1].rect.h = ROW_H // 2  # the lowest row getting shorter
+    frame.invalidate_layout()
+    window.layout_solver.solve()
+    assert page.content_h == ROWS * ROW_H - ROW_H // 2
+
+    page.clear()
+    window.layout_solver.solve()
+    assert page.content_h == 0
@@ -0,0 +1,60 @@
+# the search index must find the same tasks as looking through the words of every task
+
+import pytest
+import task_data as td
+from storage_helpers import forget_tasks
+
+pytestmark = pytest.mark.usefixtures("save_files")
+
+TASKS = [("a", "Chem exam", "Study chapters 1 and 2", "05/03/2026"),
+         ("b", "Chemistry lab report", "", "01/03/2026"),
+         ("c", "Math exam", "Chapter 4", "30/02/2026"),  # due date that does not exist, found last
+         ("d", "French oral", "Practise the exam questions", "03/03/2026")]
+
+
+def register_tasks():
+    tasks = dict()
+    for code, title, description, date in TASKS:
+        tasks[code] = td.Task(code, title, description, date, 0, None)
+        td.register_task(tasks[code])
+    return tasks
+
+
+# returns the codes of the tasks found by a search
+def codes(query):
+    return [task.taskcode for task in td.search_index.search(query)]
+
+
+def test_prefix_search():
+    register_tasks()
+    assert codes("chem") == ["b", "a"]  # soonest due first
+    assert codes("exam") == ["d", "a", "c"]
+    assert codes("chapter") == ["a", "c"]  # "chapters" starts with "chapter"
+    assert codes("exam chap") == ["a", "c"]  # only the last word is a prefix
+    assert codes("exa chapter") == []
+    assert codes("  ") == []
+    assert [task.taskcode for task in td.search_index.search("exam", limit=2)] == ["d", "a"]
+
+
+def test_index_is_built_from_registered_tasks_on_the_first_search():
+    tasks = register_tasks()
+    assert not td.search_index.built
+    td.unregister_task(tasks["b"])  # before building, nothing has to be taken out
+    assert codes("chem") == ["a"]
+    assert td.search_index.built
+
+
+def test_removal_and_edits():
+    tasks = register_tasks()
+    codes("chem")  # builds the index
+    td.unregister_task(tasks["a"])
+    assert codes("chem") == ["b"]
+    assert "study" not in td.search_index.codes  # words of no other task are taken out
+    task = tasks["c"]
+    td.unregister_task(task)
+    task.title = "Algebra quiz"
+    td.register_task(task)
+    assert codes("exam") == ["d"]
+    assert codes("alg") == ["c"]
+    forget_tasks()
+    assert codes("alg") == []
@@ -0,0 +1,50 @@
+# folders must keep their tasks sorted like sorting the tasks each time, with tied tasks in the order added
+
+import random
+import task_data as td
+
+
+def make_task(i, priority, date):
+    return td.Task(str(i), "Task " + str(i), "", date, priority, None)
+
+
+def test_sorted_insert_and_remove_with_tied_keys():
+    random.seed(3)
+    folder = td.Folder("Main")
+    added = []  # the folder's tasks in the order they were added
+    dates = ["01/03/2026", "02/03/2026", "30/02/2026", "01/03/2026"]  # tied days, and a date that does not exist
+    for i in range(300):
+        if added and random.random() < 0.3:
+            task = added.pop(random.randrange(len(added)))
+            folder.remove(task)
+        else:
+            task = make_task(i, random.randint(0, 3), random.choice(dates))
+            folder.add(task)
+            added.append(task)
+        # sorted is stable, so tied tasks stay in the order they were added
+        assert folder.by_priority.tasks == sorted(added, key=lambda task: -task.priority)
+        assert folder.by_date.tasks == sorted(added, key=td.due_day_key)
+        assert folder.by_priority.keys == [-task.priority for task in folder.by_priority.tasks]
+
+
+def test_removing_a_tied_task_removes_only_that_task():
+    tasks = td.SortedTasks(lambda task: task.priority)
+    first, second, third = make_task(1, 5, "01/03/2026"), make_task(2, 5, "01/03/2026"), make_task(3, 5, "01/03/2026")
+    for task in (first, second, third):
+        tasks.add(task)
+    tasks.remove(second)
+    assert tasks.tasks == [first, third]
+    tasks.add(second)
+    assert tasks.tasks == [first, third, second]
+
+
+def test_sorted_contents_puts_folders_first():
+    folder = td.Folder("Main")
+    sub_folder = td.Folder("Sub", folder)
+    low, high = make_task(1, 1, "05/03/2026"), make_task(2, 9, "01/03/2026")
+    for item in (low, sub_folder, high):
+        folder.add(item)
+    assert folder.sorted_contents() == [sub_folder, high, low]
+    assert folder.sorted_contents(by_date=True) == [sub_folder, high, low]
+    folder.remove(high)
+    assert folder.sorted_contents(by_date=True) == [sub_folder, low]
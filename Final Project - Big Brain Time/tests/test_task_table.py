@@ -0,0 +1,96 @@
+# the task table's counts must match counting the tasks by walking the folder tree
+
+import random
+import pytest
+import task_data as td
+
+np = pytest.importorskip("numpy")  # the task table is only kept when numpy is installed
+
+pytestmark = pytest.mark.usefixtures("save_files")
+
+FIRST_DAY = td.date_ordinal("01/01/2026")
+
+
+# returns list of every task in a folder and its sub folders
+def walk(folder):
+    tasks = [item for item in folder.contents if type(item) is td.Task]
+    for item in folder.subfolders():
+        tasks += walk(item)
+    return tasks
+
+
+# returns a random "dd/mm/yyyy" due date in the first 90 days of 2026, or one that does not exist
+def random_date():
+    if random.random() < 0.05:
+        return "30/02/2026"
+    day = td.datetime.date.fromordinal(FIRST_DAY + random.randrange(90))
+    return day.strftime("%d/%m/%Y")
+
+
+# makes a folder tree of random tasks (more than the table starts with rows for), then removes, edits and
+# moves some of them through the task registry like the main program does
+def random_tree():
+    random.seed(7)
+    td.create_task_table()
+    main_folder = td.Folder("Main")
+    folders = [main_folder]
+    for i in range(12):
+        folder = td.Folder("Folder " + str(i), random.choice(folders))
+        folder.parent.add(folder)
+        folders.append(folder)
+    tasks = []
+    for i in range(1500):
+        task = td.Task(td.Task.generate_task_code(), "Task", "", random_date(), random.randint(0, 10),
+                       random.choice(folders))
+        task.parent.add(task)
+        td.register_task(task)
+        tasks.append(task)
+    random.shuffle(tasks)
+    for task in tasks[:300]:  # completed
+        task.parent.remove(task)
+        td.unregister_task(task)
+    for task in tasks[300:400]:  # edited
+        td.unregister_task(task)
+        task.parent.remove(task)
+        task.set_date(random_date())
+        task.priority = random.randint(0, 10)
+        task.parent.add(task)
+        td.register_task(task)
+    for task in tasks[400:450]:  # moved
+        td.unregister_task(task)
+        task.parent.remove(task)
+        task.parent = random.choice(folders)
+        task.parent.add(task)
+        td.register_task(task)
+    for task in tasks[:20]:  # added back after being removed
+        task.parent.add(task)
+        td.register_task(task)
+    return main_folder, folders
+
+
+def test_table_counts_match_the_folder_tree():
+    main_folder, folders = random_tree()
+    table = td.table
+    tasks = walk(main_folder)
+    assert int(table.active().sum()) == len(tasks)
+
+    first_day, last_day = FIRST_DAY + 10, FIRST_DAY + 40
+    due = [task for task in tasks if task.due_day is not None and first_day <= task.due_day <= last_day]
+    assert int(table.due_between(first_day, last_day).sum()) == len(due)
+    assert int(table.overdue(first_day).sum()) == len([task for task in tasks if task.due_day is not None and
+                                                       task.due_day < first_day])
+    assert table.count_by_day(first_day, last_day).tolist() == [
+        len([task for task in due if task.due_day == day]) for day in range(first_day, last_day + 1)]
+
+    priorities = dict()
+    for task in tasks:
+        priorities[task.priority] = priorities.get(task.priority, 0) + 1
+    assert table.priority_counts() == priorities
+
+    rows = table.due_between(first_day, last_day)
+    assert table.count_by_folder(rows, include_sub_folders=False) == {
+        folder: len([task for task in due if task.parent is folder]) for folder in folders
+        if any(task.parent is folder for task in due)}
+    assert table.count_by_folder(rows) == {
+        folder: len([task for task in walk(folder) if task in due]) for folder in folders
+        if any(task in due for task in walk(folder))}